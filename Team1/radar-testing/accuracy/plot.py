@@ -3,9 +3,12 @@
 import matplotlib.pyplot as plt
 import numpy as np
 import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import capture
 
 peaks = {}
-data = np.loadtxt(sys.argv[1])
+data = capture.load(sys.argv[1])
 
 init_time = 0
 for d in data:
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+
+# Binary radar captures: a small header followed by fixed-width records,
+# opened with np.memmap so plotting a long capture doesn't parse text or
+# pull the whole file into RAM.
+#
+#   magic "RCAP" | u2 version | u2 header length | JSON record dtype | records
+#
+# The record count isn't stored, it comes from the file size, so a
+# capture that is still being written (or was cut off) can be opened.
+
+import json, struct
+import numpy as np
+
+MAGIC = b"RCAP"
+VERSION = 1
+HEADER_ALIGN = 64
+
+# peak index, distance (mm), strength, timestamp (ms) — the accuracy and
+# filtering .dat layout
+PEAK_DTYPE = np.dtype([("peak", "<u1"), ("distance", "<f8"), ("strength", "<u4"), ("timestamp", "<i8")])
+
+def values_dtype(n_columns):
+    return np.dtype([("values", "<f8", (n_columns,))])
+
+def dtype_for(n_columns):
+    return PEAK_DTYPE if n_columns == len(PEAK_DTYPE) else values_dtype(n_columns)
+
+def is_capture(path):
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+def header(dtype):
+    descr = json.dumps(dtype.descr).encode("ascii")
+    length = len(MAGIC) + 4 + len(descr)
+    length += -length % HEADER_ALIGN
+    return (MAGIC + struct.pack("<HH", VERSION, length) + descr).ljust(length, b" ")
+
+def read_header(f):
+    if f.read(len(MAGIC)) != MAGIC: raise ValueError("not a radar capture")
+    version, length = struct.unpack("<HH", f.read(4))
+    if version != VERSION: raise ValueError(f"unsupported capture version {version}")
+    descr = json.loads(f.read(length - len(MAGIC) - 4))
+    return np.dtype([(d[0], d[1]) + tuple(tuple(s) for s in d[2:]) for d in descr]), length
+
+def write_capture(path, records):
+    records = np.asarray(records)
+    with open(path, "wb") as f:
+        f.write(header(records.dtype))
+        f.write(records.tobytes())
+
+def open_capture(path, mode="r"):
+    with open(path, "rb") as f:
+        dtype, offset = read_header(f)
+        f.seek(0, 2)
+        n = (f.tell() - offset) // dtype.itemsize
+
+    if n == 0: return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode=mode, offset=offset, shape=(n,))
+
+def read_text(path, skip=0):
+    with open(path) as f:
+        for _ in range(skip): f.readline()
+        text = f.read().replace(",", " ")
+
+    data = np.loadtxt(text.splitlines(), ndmin=2)
+    return to_records(data)
+
+def to_records(data):
+    dtype = dtype_for(data.shape[1])
+    records = np.zeros(len(data), dtype=dtype)
+    if dtype == PEAK_DTYPE:
+        for i, name in enumerate(dtype.names): records[name] = data[:, i]
+    else:
+        records["values"] = data
+    return records
+
+# load either a binary capture or a text .dat/.tsv as records
+def load(path, mode="r"):
+    if is_capture(path): return open_capture(path, mode)
+    return read_text(path)
+
+def convert(path, out=None, skip=None):
+    if skip is None: skip = 9 if path.endswith(".csv") else 0
+    if out  is None: out  = path.rsplit(".", 1)[0] + ".cap"
+
+    write_capture(out, read_text(path, skip))
+    return out
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="convert radar .csv/.dat/.tsv captures to .cap")
+    ap.add_argument("files", nargs="+")
+    ap.add_argument("--skip", type=int, default=None, help="header lines to drop (default 9 for .csv)")
+    args = ap.parse_args()
+
+    for f in args.files:
+        print(f, "->", convert(f, skip=args.skip))
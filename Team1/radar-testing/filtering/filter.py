@@ -1,5 +1,6 @@
 import numpy as np
 from scipy.signal import butter
+from scipy.signal import lfilter
 from scipy.signal import freqz
 import scipy.signal as signal
 import matplotlib.pyplot as plt
@@ -29,6 +30,28 @@ class IIRFilter():
 
         return accumulator
 
+    def filter_block(self, samples):
+        samples = np.asarray(samples, dtype=float)
+        if samples.size == 0: return samples.copy()
+
+        # feed-forward half, summed in the same order as filter()
+        x1 = np.concatenate(([self.tb1], samples[:-1]))
+        x2 = np.concatenate(([self.tb2, self.tb1], samples[:-2]))[:len(samples)]
+        accumulator  = samples * self.b[0]
+        accumulator += x1      * self.b[1]
+        accumulator += x2      * self.b[2]
+
+        # feedback half, seeded from ta1/ta2 so consecutive blocks join up
+        zi = [-(self.ta2 * self.a[1]) - self.ta1 * self.a[0], -(self.ta1 * self.a[1])]
+        out, _ = lfilter([1.0, 0.0, 0.0], [1.0, self.a[0], self.a[1]], accumulator, zi=zi)
+
+        self.tb2 = x1[-1]
+        self.tb1 = samples[-1]
+        self.ta2 = out[-2] if len(out) > 1 else self.ta1
+        self.ta1 = out[-1]
+
+        return out
+
 class Filter():
     def __init__(self, fs, f_pass):
         coeffs = butter(2, f_pass, btype="lowpass", fs=fs, output="sos")
@@ -39,6 +62,44 @@ class Filter():
 
         return sample
 
+    def filter_block(self, samples):
+        for iir in self.__iirs: samples = iir.filter_block(samples)
+
+        return samples
+
+class FilterBank():
+    def __init__(self, n_channels, fs, f_pass):
+        coeffs = butter(2, f_pass, btype="lowpass", fs=fs, output="sos")
+        self.b = coeffs[:, 0:3]
+        self.a = coeffs[:, 4:]
+
+        # per channel, per section: tb1, tb2, ta1, ta2
+        self.state = np.zeros((n_channels, len(coeffs), 4))
+
+    def filter(self, samples):
+        samples = np.asarray(samples, dtype=float)
+
+        for i, (b, a) in enumerate(zip(self.b, self.a)):
+            st = self.state[:, i]
+            accumulator  = samples  * b[0]
+            accumulator += st[:, 0] * b[1]
+            accumulator += st[:, 1] * b[2]
+            accumulator -= st[:, 2] * a[0]
+            accumulator -= st[:, 3] * a[1]
+
+            st[:, 1] = st[:, 0]
+            st[:, 0] = samples
+            st[:, 3] = st[:, 2]
+            st[:, 2] = accumulator
+
+            samples = accumulator
+
+        return samples
+
+    def reset(self, channel=None):
+        if channel is None: self.state[:] = 0
+        else:               self.state[channel] = 0
+
 def test_filter():
     # test signal
     fs = 1000
@@ -127,5 +188,39 @@ class FilterTest(unittest.TestCase):
         self.passband_attenuation(200)
 
 
+    # TEST BLOCK PROCESSING
+    def test_filter_block_matches_filter(self):
+        fs = 1000
+        signal = self.gen_test_signal(fs)
+
+        filter = Filter(fs, 50)
+        out_signal = [filter.filter(x) for x in signal]
+        out_block = Filter(fs, 50).filter_block(signal)
+        np.testing.assert_allclose(out_block, out_signal, rtol=1e-12, atol=1e-15)
+
+    def test_filter_block_streaming_matches_batch(self):
+        fs = 1000
+        signal = np.random.default_rng(0).normal(size=fs)
+
+        batch = Filter(fs, 50).filter_block(signal)
+
+        filter = Filter(fs, 50)
+        streamed = np.concatenate([filter.filter_block(c) for c in np.array_split(signal, [1, 2, 7, 300, 301, 640])])
+        np.testing.assert_array_equal(streamed, batch)
+
+
+    # TEST FILTER BANK
+    def test_filter_bank_matches_filter(self):
+        fs = 10
+        frames = np.random.default_rng(1).uniform(0, 7000, size=(200, 5))
+
+        bank = FilterBank(5, fs, 2.5)
+        out_bank = np.array([bank.filter(f) for f in frames])
+
+        for c in range(5):
+            filter = Filter(fs, 2.5)
+            np.testing.assert_array_equal(out_bank[:, c], [filter.filter(x) for x in frames[:, c]])
+
+
 if __name__ == "__main__":
     unittest.main()
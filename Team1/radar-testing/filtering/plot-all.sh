@@ -1,3 +1,9 @@
 #!/usr/bin/env bash 
 
-for f in *.dat ; do echo "$f" ; ./$1 $f > /dev/null ; done
+shopt -s nullglob
+
+for f in *.dat *.cap ; do
+    # after convert.sh a capture is in both formats, plot it once from the .cap
+    [[ $f == *.dat && -e ${f%.dat}.cap ]] && continue
+    echo "$f" ; ./$1 $f > /dev/null
+done
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+
+# Windowed median over the last `window` samples. The median of an even
+# count is the mean of the two middle values, the same as np.median.
+# Until the window fills, it is the median of the samples seen so far.
+
+import heapq
+from collections import deque, defaultdict
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+import unittest
+
+class RunningMedian():
+    # Two heaps: a max-heap (negated) for the lower half and a min-heap for
+    # the upper half. Values that fall out of the window are only counted in
+    # __expired and removed when they reach the top of a heap, which keeps
+    # each update O(log k).
+    def __init__(self, window):
+        if window < 1: raise ValueError("window must be at least 1")
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        self.__samples = deque()
+        self.__low = []
+        self.__high = []
+        self.__low_size = 0
+        self.__high_size = 0
+        self.__expired = defaultdict(int)
+
+    def __len__(self):
+        return len(self.__samples)
+
+    def __prune(self, heap, sign):
+        while heap and sign * heap[0] in self.__expired:
+            value = sign * heapq.heappop(heap)
+            self.__expired[value] -= 1
+            if self.__expired[value] == 0: del self.__expired[value]
+
+    # rebuild once stale entries outnumber live ones, so memory stays O(k)
+    def __compact(self):
+        ordered = sorted(self.__samples)
+        self.__low_size = (len(ordered) + 1) // 2
+        self.__high_size = len(ordered) - self.__low_size
+        self.__low = [-v for v in ordered[:self.__low_size]]
+        self.__high = ordered[self.__low_size:]
+        heapq.heapify(self.__low)
+        self.__expired.clear()
+
+    def __balance(self):
+        if self.__low_size > self.__high_size + 1:
+            heapq.heappush(self.__high, -heapq.heappop(self.__low))
+            self.__low_size -= 1; self.__high_size += 1
+            self.__prune(self.__low, -1)
+        elif self.__low_size < self.__high_size:
+            heapq.heappush(self.__low, -heapq.heappop(self.__high))
+            self.__low_size += 1; self.__high_size -= 1
+            self.__prune(self.__high, 1)
+
+    def push(self, sample):
+        sample = float(sample)
+        self.__samples.append(sample)
+
+        if not self.__low or sample <= -self.__low[0]:
+            heapq.heappush(self.__low, -sample); self.__low_size += 1
+        else:
+            heapq.heappush(self.__high, sample); self.__high_size += 1
+
+        if len(self.__samples) > self.window:
+            old = self.__samples.popleft()
+            self.__expired[old] += 1
+            if old <= -self.__low[0]:
+                self.__low_size -= 1
+                if old == -self.__low[0]: self.__prune(self.__low, -1)
+            else:
+                self.__high_size -= 1
+                if old == self.__high[0]: self.__prune(self.__high, 1)
+
+        self.__balance()
+        self.__prune(self.__low, -1)
+        self.__prune(self.__high, 1)
+
+        if len(self.__low) + len(self.__high) > 2 * self.window: self.__compact()
+
+        return self.median()
+
+    def median(self):
+        if not self.__samples: return np.nan
+        if self.__low_size > self.__high_size: return -self.__low[0]
+        return (-self.__low[0] + self.__high[0]) / 2
+
+def rolling_median(samples, window):
+    samples = np.asarray(samples, dtype=float)
+    out = np.empty(len(samples))
+
+    head = min(window - 1, len(samples))
+    for i in range(head): out[i] = np.median(samples[:i + 1])
+    if len(samples) >= window:
+        out[head:] = np.median(sliding_window_view(samples, window), axis=1)
+
+    return out
+
+
+class RunningMedianTest(unittest.TestCase):
+
+    def brute_force(self, samples, window):
+        return [np.median(samples[max(0, i - window + 1):i + 1]) for i in range(len(samples))]
+
+    def check(self, samples, window):
+        expected = self.brute_force(samples, window)
+
+        rm = RunningMedian(window)
+        np.testing.assert_array_equal([rm.push(x) for x in samples], expected)
+        np.testing.assert_array_equal(rolling_median(samples, window), expected)
+
+    def test_odd_window(self):
+        self.check(np.random.default_rng(0).normal(size=500), 5)
+
+    def test_even_window(self):
+        self.check(np.random.default_rng(1).normal(size=500), 10)
+
+    def test_repeated_values(self):
+        self.check(np.random.default_rng(2).integers(0, 4, size=500).astype(float), 7)
+
+    def test_short_input(self):
+        self.check(np.array([3.0, 1.0]), 5)
+
+    def test_window_one(self):
+        self.check(np.arange(10.0), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+# Regroup a peak capture (peak index, distance, strength, timestamp rows)
+# into frames and per-peak series without walking it row by row.
+#
+# A frame starts at every row whose peak index is 0. Like the original
+# plot loops, each column is sorted on its own within a frame, and the
+# last frame is left out since it may still be partial.
+
+import numpy as np
+import unittest
+
+COLUMNS = ("peak", "distance", "strength", "timestamp")
+
+def as_columns(data):
+    if data.dtype.names: return np.column_stack([np.asarray(data[n], dtype=float) for n in COLUMNS])
+    return np.asarray(data, dtype=float)
+
+def frames(data):
+    data = as_columns(data)
+
+    starts = np.flatnonzero(data[:, 0] == 0)
+    if len(starts) == 0 or starts[0] != 0: starts = np.concatenate(([0], starts))
+    lengths = np.diff(starts)
+    if len(lengths) == 0: return np.zeros((0, 0, data.shape[1]))
+
+    n = starts[-1]
+    frame = np.repeat(np.arange(len(lengths)), lengths)
+    slot = np.arange(n) - np.repeat(starts[:-1], lengths)
+
+    # frames with fewer peaks are NaN padded, np.sort leaves NaN at the end
+    dense = np.full((len(lengths), lengths.max(), data.shape[1]), np.nan)
+    dense[frame, slot] = data[:n]
+    return np.sort(dense, axis=1)
+
+def group_peaks(data):
+    columns = as_columns(data)
+    nonzero = np.flatnonzero(columns[:, 3] != 0)
+    init_time = columns[nonzero[0], 3] if len(nonzero) else 0
+
+    f = frames(columns)
+    index = f[:, :, 0].ravel()
+    valid = ~np.isnan(index)
+    index, distance, time = index[valid], f[:, :, 1].ravel()[valid], f[:, :, 3].ravel()[valid] - init_time
+
+    # keep the order peaks first appear in, so plot colours don't move
+    keys, first = np.unique(index, return_index=True)
+    return {k: np.array([distance[index == k], time[index == k]]) for k in keys[np.argsort(first)]}
+
+
+class GroupPeaksTest(unittest.TestCase):
+
+    # the per-row loop the accuracy plotters used to run
+    def group_peaks_loop(self, data):
+        peaks = {}
+        init_time = 0
+        current_peaks = []
+        for d in data:
+            if init_time == 0:
+                init_time = d[3]
+
+            if d[0] == 0 and len(current_peaks) != 0:
+                current_peaks = np.sort(current_peaks, axis=0)
+                for cp in current_peaks:
+                    if cp[0] not in peaks: peaks[cp[0]] = [[], []]
+                    peaks[cp[0]][1].append(cp[3] - init_time)
+                    peaks[cp[0]][0].append(cp[1])
+
+                current_peaks = []
+
+            current_peaks.append(d)
+        return peaks
+
+    def gen_capture(self, n_frames):
+        rng = np.random.default_rng(0)
+        rows, t = [[1, 500, 10, 1000]], 1000
+        for _ in range(n_frames):
+            for p in range(rng.integers(1, 6)):
+                t += 1
+                rows.append([p, rng.integers(100, 7000), rng.integers(0, 2**32), t])
+        return np.array(rows, dtype=float)
+
+    def test_group_peaks_matches_loop(self):
+        data = self.gen_capture(500)
+
+        expected = self.group_peaks_loop(data)
+        got = group_peaks(data)
+        self.assertEqual(list(got.keys()), list(expected.keys()))
+        for k in expected:
+            np.testing.assert_array_equal(got[k], np.array(expected[k]))
+
+    def test_frames_shape(self):
+        data = np.array([[0, 3, 0, 1], [1, 1, 0, 2], [0, 2, 0, 3], [0, 5, 0, 4]], dtype=float)
+
+        f = frames(data)
+        self.assertEqual(f.shape, (2, 2, 4))
+        np.testing.assert_array_equal(f[0, :, 1], [1, 3])
+        self.assertTrue(np.isnan(f[1, 1, 1]))
+
+
+if __name__ == "__main__":
+    unittest.main()
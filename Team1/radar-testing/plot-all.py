@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+
+# Render every plot variant for every capture in the given directories on a
+# process pool. Each worker imports numpy/matplotlib once and then runs the
+# plot-*.py scripts in-process, so the cost scales with cores rather than
+# with files. Outputs newer than their capture are skipped, and so is a .dat
+# that convert.sh has turned into a .cap of the same name.
+#
+#   ./plot-all.py                      # accuracy/ and filtering/
+#   ./plot-all.py filtering -j 4 --variants median filtered
+
+import argparse, glob, os, runpy, sys, time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+def variant(script):
+    name = os.path.basename(script)[:-len(".py")]
+    return name[len("plot-"):] if name.startswith("plot-") else ""
+
+def output(capture, script):
+    suffix = variant(script)
+    return os.path.join(os.path.dirname(capture), "plots",
+                        os.path.basename(capture) + (f"-{suffix}" if suffix else "") + ".pdf")
+
+def stale(capture, script):
+    out = output(capture, script)
+    return not os.path.exists(out) or os.path.getmtime(out) < os.path.getmtime(capture)
+
+def jobs(dirs, variants, force):
+    for d in dirs:
+        scripts = sorted(glob.glob(os.path.join(d, "plot*.py")))
+        if variants: scripts = [s for s in scripts if (variant(s) or "raw") in variants]
+
+        caps = glob.glob(os.path.join(d, "*.cap"))
+        dats = [f for f in glob.glob(os.path.join(d, "*.dat")) if f[:-len(".dat")] + ".cap" not in caps]
+        captures = sorted(dats + caps)
+        for c in captures:
+            for s in scripts:
+                if force or stale(c, s): yield c, s
+
+def init_worker():
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot
+    import numpy
+
+def render(capture, script):
+    import matplotlib.pyplot as plt
+
+    d = os.path.dirname(os.path.abspath(capture))
+    saved_path, saved_argv, saved_cwd = sys.path[:], sys.argv[:], os.getcwd()
+    try:
+        os.chdir(d)
+        os.makedirs("plots", exist_ok=True)
+        sys.path.insert(0, d)
+        sys.argv = [script, os.path.basename(capture)]
+        start = time.perf_counter()
+        runpy.run_path(os.path.abspath(os.path.join(saved_cwd, script)), run_name="__main__")
+        return time.perf_counter() - start
+    finally:
+        plt.close("all")
+        sys.path[:], sys.argv = saved_path, saved_argv
+        os.chdir(saved_cwd)
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="render all radar capture plots in parallel")
+    ap.add_argument("dirs", nargs="*", default=[os.path.join(HERE, "accuracy"), os.path.join(HERE, "filtering")])
+    ap.add_argument("-j", "--jobs", type=int, default=os.cpu_count())
+    ap.add_argument("--variants", nargs="+", help="e.g. raw ordered median filtered")
+    ap.add_argument("-f", "--force", action="store_true", help="re-render up-to-date plots too")
+    args = ap.parse_args()
+
+    todo = list(jobs(args.dirs, args.variants, args.force))
+    if not todo:
+        print("all plots up to date")
+        sys.exit(0)
+
+    failed = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.jobs, initializer=init_worker) as pool:
+        futures = {pool.submit(render, c, s): (c, s) for c, s in todo}
+        for f in as_completed(futures):
+            c, s = futures[f]
+            try:
+                print(f"{output(c, s)}  ({f.result():.2f}s)")
+            except Exception as e:
+                failed += 1
+                print(f"{c} {os.path.basename(s)} failed: {e}", file=sys.stderr)
+
+    print(f"{len(todo) - failed}/{len(todo)} plots in {time.perf_counter() - start:.1f}s")
+    sys.exit(1 if failed else 0)
@@ -4,8 +4,13 @@
 import numpy as np
 import matplotlib.pyplot as plt
 from sys import argv
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import capture
 
-data = np.loadtxt(argv[1])
+# copy-on-write: the sort below edits rows without touching the file
+data = capture.load(argv[1], mode="c")["values"]
 
 c = 0
 for i, d in enumerate(data):
@@ -0,0 +1,41 @@
+import numpy as np
+
+# Axis handling for the blitted live plots. Limits stay fixed while the
+# data fits inside them, so the blit background (grid, ticks, legend) can be
+# reused. They're only recomputed, with some room to grow, once a point
+# falls outside.
+
+def finite(values, log=False):
+    values = np.asarray(values)
+    values = values[np.isfinite(values)]
+    return values[values > 0] if log else values
+
+def in_view(ax, x, y):
+    x = finite(x, ax.get_xscale() == "log")
+    y = finite(y, ax.get_yscale() == "log")
+    if len(x) == 0 or len(y) == 0: return True
+
+    x0, x1 = sorted(ax.get_xlim())
+    y0, y1 = sorted(ax.get_ylim())
+    return x0 <= x.min() and x.max() <= x1 and y0 <= y.min() and y.max() <= y1
+
+def rescale(ax, lookahead=0.5):
+    ax.relim()
+    ax.autoscale()
+
+    # leave room ahead on the x (time) axis so it doesn't rescale every frame
+    lo, hi = ax.get_xlim()
+    if ax.get_xscale() == "log": ax.set_xlim(lo, hi * (hi / lo) ** lookahead)
+    else:                        ax.set_xlim(lo, hi + (hi - lo) * lookahead)
+
+# Call from the FuncAnimation callback after setting line data. Returns True
+# if the limits moved; the figure is then redrawn once so the animation
+# grabs a fresh background for blitting.
+def keep_in_view(ax, lines, lookahead=0.5):
+    x = np.concatenate([np.asarray(l.get_xdata(), dtype=float) for l in lines])
+    y = np.concatenate([np.asarray(l.get_ydata(), dtype=float) for l in lines])
+    if in_view(ax, x, y): return False
+
+    rescale(ax, lookahead)
+    ax.figure.canvas.draw()
+    return True
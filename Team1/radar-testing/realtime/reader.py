@@ -0,0 +1,146 @@
+import sys
+import threading
+import numpy as np
+import unittest
+
+# Single-producer/single-consumer ring of fixed-width rows. The writer fills
+# a row and then bumps `count`, so a reader that only looks at rows below the
+# count it saw never sees a half-written row. Nothing is locked; keep the
+# capacity well above the window you snapshot so the writer can't lap it
+# mid-copy.
+class RingBuffer():
+    def __init__(self, capacity, width):
+        self.capacity = capacity
+        self.data = np.zeros((capacity, width))
+        self.count = 0
+
+    def push(self, row):
+        self.data[self.count % self.capacity] = row
+        self.count += 1
+
+    def extend(self, rows):
+        rows = np.asarray(rows)[-self.capacity:]
+        self.data[(self.count + np.arange(len(rows))) % self.capacity] = rows
+        self.count += len(rows)
+
+    def latest(self, n, out=None):
+        count = self.count
+        n = min(n, count, self.capacity)
+        idx = np.arange(count - n, count) % self.capacity
+        if out is None: return self.data[idx]
+        return np.take(self.data, idx, axis=0, out=out[:n])
+
+    def clear(self):
+        self.count = 0
+
+# Reads the port in whatever chunks are waiting. Without a parser, it splits
+# lines and hands each one to `ingest`, which returns a row for the ring (or
+# None to skip it). With a telemetry.LineParser, `ingest` gets each parsed
+# batch of records and returns the rows to append. If reading or ingesting
+# raises, the thread ends and keeps the exception in `error` for the plotting
+# loop to report.
+class SerialReader(threading.Thread):
+    def __init__(self, ser, ingest, ring, parser=None, chunk=4096):
+        super().__init__(daemon=True)
+        self.ser = ser
+        self.ingest = ingest
+        self.ring = ring
+        self.parser = parser
+        self.chunk = chunk
+        self.lines = 0
+        self.running = True
+        self.error = None
+
+    def run(self):
+        try:
+            self.read_loop()
+        except Exception as e:
+            self.error = e
+            print(f"Serial reader stopped: {e!r}", file=sys.stderr)
+
+    def read_loop(self):
+        pending = b""
+        while self.running:
+            data = self.ser.read(max(1, min(self.ser.in_waiting, self.chunk)))
+            if not data: continue
+
+            if self.parser is not None:
+                records = self.parser.feed(data)
+                self.lines = self.parser.lines
+                if len(records): self.ring.extend(self.ingest(records))
+                continue
+
+            *lines, pending = (pending + data).split(b"\n")
+            for line in lines:
+                self.lines += 1
+                row = self.ingest(line)
+                if row is not None: self.ring.push(row)
+
+    def stop(self):
+        self.running = False
+
+
+class RingBufferTest(unittest.TestCase):
+
+    def test_latest_wraps(self):
+        ring = RingBuffer(8, 2)
+        for i in range(13): ring.push([i, -i])
+
+        np.testing.assert_array_equal(ring.latest(5)[:, 0], [8, 9, 10, 11, 12])
+        np.testing.assert_array_equal(ring.latest(100)[:, 0], np.arange(5, 13))
+
+    def test_extend_wraps(self):
+        ring = RingBuffer(4, 1)
+        ring.extend([[0], [1], [2]])
+        ring.extend([[3], [4], [5]])
+
+        np.testing.assert_array_equal(ring.latest(4)[:, 0], [2, 3, 4, 5])
+        ring.extend(np.arange(10).reshape(-1, 1))
+        np.testing.assert_array_equal(ring.latest(4)[:, 0], [6, 7, 8, 9])
+
+    def test_latest_into_buffer(self):
+        ring = RingBuffer(4, 2)
+        for i in range(6): ring.push([i, i])
+
+        out = np.zeros((3, 2))
+        window = ring.latest(3, out=out)
+        self.assertTrue(np.shares_memory(window, out))
+        np.testing.assert_array_equal(out[:, 0], [3, 4, 5])
+
+    def test_latest_short(self):
+        ring = RingBuffer(8, 1)
+        self.assertEqual(len(ring.latest(4)), 0)
+        ring.push([1])
+        np.testing.assert_array_equal(ring.latest(4)[:, 0], [1])
+
+    def test_reader_splits_chunks(self):
+        class FakeSerial():
+            def __init__(self, chunks): self.chunks = list(chunks)
+            @property
+            def in_waiting(self): return len(self.chunks[0]) if self.chunks else 0
+            def read(self, n):
+                if not self.chunks: reader.stop(); return b""
+                return self.chunks.pop(0)
+
+        ring = RingBuffer(16, 1)
+        reader = SerialReader(FakeSerial([b"1\n2", b"\n3\n", b"x\n4\n"]), lambda l: [float(l)] if l.isdigit() else None, ring)
+        reader.run()
+
+        np.testing.assert_array_equal(ring.latest(10)[:, 0], [1, 2, 3, 4])
+        self.assertEqual(reader.lines, 5)
+
+    def test_reader_keeps_error(self):
+        class BrokenSerial():
+            in_waiting = 0
+            def read(self, n): raise OSError("device disconnected")
+
+        reader = SerialReader(BrokenSerial(), lambda l: None, RingBuffer(4, 1))
+        reader.start()
+        reader.join(1)
+
+        self.assertFalse(reader.is_alive())
+        self.assertIsInstance(reader.error, OSError)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,13 +3,22 @@
 import sys, re, serial, argparse
 import matplotlib.pyplot as plt
 import matplotlib.animation as ani
-from collections import defaultdict, deque
 import numpy as np
-from filter import Filter
+from filter import FilterBank
+from reader import RingBuffer, SerialReader
+from telemetry import LineParser, RADAR_DTYPE
+from liveplot import keep_in_view
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from median import RunningMedian
 
 # ── args ──────────────────────────────────────────────────────────
 ap = argparse.ArgumentParser()
 ap.add_argument("port"), ap.add_argument("baud", type=int)
+ap.add_argument("--no-blit", dest="blit", action="store_false",
+                help="redraw and autoscale the whole figure every frame")
+ap.add_argument("--median", type=int, default=0, metavar="N",
+                help="median filter over the last N samples instead of the low-pass")
 args = ap.parse_args()
 
 # ── serial ────────────────────────────────────────────────────────
@@ -25,72 +34,72 @@ plt.xlabel("time (ms)")
 
 keep = 50
 lines = []
-dists = []
-dists_filtered = []
-since_update = []
-iir_filters = []
-times = deque(maxlen=keep)
+last = np.zeros(5)
+since_update = np.zeros(5, dtype=int)
+iir_bank = FilterBank(5, 10, 2.5)
+medians = [RunningMedian(args.median) for i in range(5)] if args.median else None
 for i in range(5):
-    since_update.append(0)
-    dists.append(deque(maxlen=keep))
-    dists[-1].append(0.0)
-
-    dists_filtered.append(deque(maxlen=keep))
-    dists_filtered[-1].append(0.0)
-
     line, = ax.plot([], [], label=f"peak {i}")
     lines.append(line)
     line, = ax.plot([], [], "--", color=line.get_color(), label=f"peak {i} filtered")
     lines.append(line)
 
-    iir_filters.append(Filter(10, 2.5))
-
 ax.legend(fontsize="small", loc="upper left")
 
+# ── serial reader thread ──────────────────────────────────────────
+# rows are: time, 5 distances, 5 filtered distances
+def ingest(records):
+    rows = np.empty((len(records), 11))
+    for row, r in zip(rows, records):
+        sorted_dists = np.sort(r["distance"][:5])
+        missing = sorted_dists == 1e8
+        since_update[:] = np.where(missing, since_update + 1, 0)
+        last[:] = np.where(missing, last, sorted_dists / 1000.0)
+        last[since_update >= keep] = 0.0
+
+        if medians: filtered = [md.push(x) for md, x in zip(medians, last)]
+        else:       filtered = iir_bank.filter(last)
+
+        row[0] = r["time"]
+        row[1:6] = last
+        row[6:] = np.where(since_update >= keep, 0.0, filtered)
+
+    return rows
+
+parser = LineParser(RADAR_DTYPE)
+ring = RingBuffer(4096, 11)
+window_buf = np.zeros((keep, 11))
+reader = SerialReader(ser, ingest, ring, parser)
+reader.start()
+
 # ── update func ───────────────────────────────────────────────────
+reported = 0
 def update(_):
-    global dists
-
-    while ser.in_waiting:
-        m=ser.readline().decode("ascii","ignore").split(",")
-        if len(m) != 20: continue
-        dists_now = list(map(float, m[2:7]))
-
-        if len(times) == 0:
-            times.append(int(m[1]))
-        times.append(int(m[1]))
-
-        sorted_dists = np.sort(dists_now)
-        i = 0
-        for d, df, f, sd in zip(dists, dists_filtered, iir_filters, sorted_dists):
-            if sd == 1e8: d.append(d[-1]);       since_update[i] += 1
-            else:         d.append(sd / 1000.0); since_update[i]  = 0 
-            
-            df.append(f.filter(d[-1]))
-            i += 1
-        
-
-    for i in range(len(dists)):
-        if since_update[i] >= keep: 
-            n = len(dists[i])
-            dists[i].clear()
-            dists_filtered[i].clear()
-            dists[i].extend(np.zeros(n))
-            dists_filtered[i].extend(np.zeros(n))
-
-    for i in range(len(dists)):
-        lines[i*2].set_data(times, dists[i])
-        lines[i*2 + 1].set_data(times, dists_filtered[i])
-
-#    for line, dist in zip(lines, dists):
-#        line.set_data(times, dist)
-    ax.relim()
-    ax.autoscale_view()
-
-    return dists
+    global reported
+    if not reader.is_alive():
+        anim.event_source.stop()
+        ax.set_title(f"Serial reader stopped: {reader.error!r}", color="red")
+        fig.canvas.draw_idle()  # a blitted frame would leave the title out
+        return lines
+
+    if parser.malformed != reported:
+        reported = parser.malformed
+        print(f"{reported} malformed of {parser.lines} lines", file=sys.stderr)
+
+    window = ring.latest(keep, out=window_buf)
+    if len(window) == 0: return lines
+
+    for i in range(5):
+        lines[i*2].set_data(window[:, 0], window[:, 1 + i])
+        lines[i*2 + 1].set_data(window[:, 0], window[:, 6 + i])
+
+    if args.blit: keep_in_view(ax, lines)
+    else:         ax.relim(); ax.autoscale_view()
+
+    return lines
 
 # ── keep a reference to avoid GC  (save_count disables the warning) ──
-anim = ani.FuncAnimation(fig, update, interval=50, blit=False,
+anim = ani.FuncAnimation(fig, update, interval=50, blit=args.blit,
                          save_count=1, cache_frame_data=False)
 
 plt.tight_layout(); plt.show()
@@ -3,12 +3,16 @@
 import sys, re, serial, argparse
 import matplotlib.pyplot as plt
 import matplotlib.animation as ani
-from collections import defaultdict, deque
 import numpy as np
+from reader import RingBuffer, SerialReader
+from telemetry import LineParser, IMU_RADAR_DTYPE
+from liveplot import keep_in_view
 
 # ── args ──────────────────────────────────────────────────────────
 ap = argparse.ArgumentParser()
 ap.add_argument("port"), ap.add_argument("baud", type=int)
+ap.add_argument("--no-blit", dest="blit", action="store_false",
+                help="redraw and autoscale the whole figure every frame")
 args = ap.parse_args()
 
 # ── serial ────────────────────────────────────────────────────────
@@ -26,68 +30,66 @@ ax.set_ylim(1, 1e5)
 
 keep = 20
 lines = []
-dists = []
-since_update = []
-times = deque(maxlen=keep)
+last = np.zeros((5, 2))
 for i in range(5):
-    since_update.append(0)
-    dists.append(deque(maxlen=keep))
-    # dists[-1].append(np.array([0.0, 0.0]))
-
     line, = ax.semilogy([1], [1], '.', label=f"peak {i}")
     lines.append(line)
 ax.legend(fontsize="small", loc="upper right")
 
 
+# ── serial reader thread ──────────────────────────────────────────
+# rows are: time, 5 distances, 5 strengths
+def ingest(records):
+    global seen
+    rows = np.empty((len(records), 11))
+    for row, r in zip(rows, records):
+        sorted_dists = np.sort(np.column_stack((r["distance"][:5] / 1000.0, r["strength"][:5])), axis=0)
+        for i, sd in enumerate(sorted_dists):
+            if sd[0] == 1e5 and seen: pass
+            elif sd[0] == 1e5 or sd[1] < -40000: last[i] = [0, 0]
+            else:            last[i] = sd
+        seen = True
+
+        row[0] = r["time"]
+        row[1:6] = last[:, 0]
+        row[6:] = last[:, 1]
+
+    return rows
+
+seen = False
+parser = LineParser(IMU_RADAR_DTYPE)
+ring = RingBuffer(4096, 11)
+window_buf = np.zeros((keep, 11))
+reader = SerialReader(ser, ingest, ring, parser)
+reader.start()
+
+
 # ── update func ───────────────────────────────────────────────────
+reported = 0
 def update(_):
-    global dists
-
-    while ser.in_waiting:
-        line = ser.readline().decode("ascii","ignore")
-        print(line, end="")
-        m=line.split(",")
-        if len(m) != 22: continue
-        dists_now = list(map(lambda x: float(x) / 1000.0, m[4:9]))
-        strengths_now = list(map(int, m[13:18]))
-
-        print(list(zip(dists_now, strengths_now)), file=sys.stderr)
-        #print(m, file=sys.stderr)
-
-        if len(times) == 0:
-            times.append(int(m[3]))
-        times.append(int(m[3]))
-
-        sorted_dists = np.sort(list(zip(dists_now, strengths_now)), axis=0)
-        print(sorted_dists, file=sys.stderr) 
-        for d, sd in zip(dists, sorted_dists):
-            if sd[0] == 1e5 and len(d) > 0: d.append(d[-1])
-            elif sd[0] == 1e5 or sd[1] < -40000: d.append([0, 0])
-            else:            d.append(sd)
-        
-        
-
-    for i in range(len(dists)):
-        if since_update[i] >= keep: 
-            n = len(dists[i])
-            dists[i].clear()
-            dists[i].extend(np.zeros(n))
-
-    if len(dists[0]) > 6:
-        print("\b" * 100, end="", file=sys.stderr)
-        #print("strength: {:05f}\tdistance: {:05f}".format( np.abs(dists[0][-1][1]), dists[0][-1][0]), end="", file=sys.stderr)
-    sys.stderr.flush()
-    for line, dist in zip(lines, dists):
-        if len(dist) == 0: continue
-
-        line.set_data(np.transpose(dist)[1], np.abs(np.transpose(dist)[0]))
-    ax.relim()
-    ax.autoscale_view()
-
-    return dists
+    global reported
+    if not reader.is_alive():
+        anim.event_source.stop()
+        ax.set_title(f"Serial reader stopped: {reader.error!r}", color="red")
+        fig.canvas.draw_idle()  # a blitted frame would leave the title out
+        return lines
+
+    if parser.malformed != reported:
+        reported = parser.malformed
+        print(f"{reported} malformed of {parser.lines} lines", file=sys.stderr)
+
+    window = ring.latest(keep, out=window_buf)
+    if len(window) == 0: return lines
+
+    for i, line in enumerate(lines):
+        line.set_data(window[:, 6 + i], np.abs(window[:, 1 + i]))
+    if args.blit: keep_in_view(ax, lines)
+    else:         ax.relim(); ax.autoscale_view()
+
+    return lines
 
 # ── keep a reference to avoid GC  (save_count disables the warning) ──
-anim = ani.FuncAnimation(fig, update, interval=50, blit=False,
+anim = ani.FuncAnimation(fig, update, interval=50, blit=args.blit,
                          save_count=1, cache_frame_data=False)
 
 plt.tight_layout(); plt.show()
@@ -0,0 +1,116 @@
+import warnings
+import numpy as np
+import unittest
+
+# XM125 CSV telemetry. The 20 field lines are what realtime.py reads, the
+# 22 field lines (with pitch and roll in front) are what strength-realtime.py
+# reads. Distances are mm with 1e8 for "no peak".
+RADAR_DTYPE = np.dtype([("yaw", "<f8"), ("time", "<f8"),
+                        ("distance", "<f8", (9,)), ("strength", "<f8", (9,))])
+IMU_RADAR_DTYPE = np.dtype([("pitch", "<f8"), ("roll", "<f8"), ("yaw", "<f8"), ("time", "<f8"),
+                            ("distance", "<f8", (9,)), ("strength", "<f8", (9,))])
+
+NEWLINE, COMMA = ord("\n"), ord(",")
+
+# Turns a stream of byte chunks into records. Lines are counted and checked
+# with NumPy on the raw buffer, the good ones are parsed in one np.fromstring
+# call and the float block is viewed as `dtype` without copying. A partial
+# last line is kept for the next chunk. Lines with the wrong field count or
+# a non-numeric field are counted in `malformed`, not silently dropped.
+class LineParser():
+    def __init__(self, dtype):
+        self.dtype = np.dtype(dtype)
+        self.n_fields = self.dtype.itemsize // 8
+        self.pending = b""
+        self.lines = 0
+        self.malformed = 0
+
+    def feed(self, data):
+        data = self.pending + data
+        buf = np.frombuffer(data, dtype=np.uint8)
+        ends = np.flatnonzero(buf == NEWLINE)
+        if len(ends) == 0:
+            self.pending = data
+            return np.zeros(0, dtype=self.dtype)
+
+        self.pending = data[ends[-1] + 1:]
+        complete = data[:ends[-1] + 1]
+
+        starts = np.concatenate(([0], ends[:-1] + 1))
+        commas = np.concatenate(([0], np.cumsum(buf[:ends[-1] + 1] == COMMA)))
+        fields = commas[ends] - commas[starts] + 1
+        blank = (ends - starts) <= 1
+        good = (fields == self.n_fields) & ~blank
+
+        self.lines += int(np.count_nonzero(~blank))
+        self.malformed += int(np.count_nonzero(~good & ~blank))
+        if not good.any(): return np.zeros(0, dtype=self.dtype)
+
+        if good.all(): text = complete
+        else:          text = b"\n".join(l for l, g in zip(complete.split(b"\n"), good) if g) + b"\n"
+
+        values = self.parse(text.replace(b"\n", b","))
+        if values.size != np.count_nonzero(good) * self.n_fields:
+            values = self.parse_each(text)
+
+        return values.view(self.dtype).reshape(-1)
+
+    def parse(self, text):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            try:               return np.fromstring(text, dtype=np.float64, sep=",")
+            except ValueError: return np.zeros(0)
+
+    # slow path, only taken when a line with the right field count didn't parse
+    def parse_each(self, text):
+        rows = []
+        for line in text.split(b"\n")[:-1]:
+            row = self.parse(line)
+            if row.size == self.n_fields: rows.append(row)
+            else:                         self.malformed += 1
+        return np.array(rows, dtype=np.float64).reshape(-1)
+
+
+class LineParserTest(unittest.TestCase):
+
+    def line(self, i):
+        return ",".join([str(i), str(1000 + i)] + [f"{1e8:.2f}"] * 9 + [str(-i)] * 9).encode() + b"\n"
+
+    def test_batch(self):
+        parser = LineParser(RADAR_DTYPE)
+        records = parser.feed(b"".join(self.line(i) for i in range(100)))
+
+        self.assertEqual(len(records), 100)
+        np.testing.assert_array_equal(records["time"], 1000 + np.arange(100))
+        np.testing.assert_array_equal(records["strength"][:, 3], -np.arange(100))
+        self.assertEqual(records["distance"].shape, (100, 9))
+        self.assertEqual(parser.malformed, 0)
+
+    def test_split_chunks(self):
+        parser = LineParser(RADAR_DTYPE)
+        data = b"".join(self.line(i) for i in range(10))
+
+        records = np.concatenate([parser.feed(data[i:i + 7]) for i in range(0, len(data), 7)])
+        np.testing.assert_array_equal(records["yaw"], np.arange(10))
+
+    def test_malformed(self):
+        parser = LineParser(RADAR_DTYPE)
+        data = self.line(0) + b"1,2,3\n" + b"\r\n" + self.line(1).replace(b"1001", b"abc") + self.line(2)
+
+        records = parser.feed(data)
+        np.testing.assert_array_equal(records["yaw"], [0, 2])
+        self.assertEqual(parser.malformed, 2)
+        self.assertEqual(parser.lines, 4)
+
+    def test_crlf(self):
+        parser = LineParser(IMU_RADAR_DTYPE)
+        line = b"-8.55,-37.80,142.50,208541,3430,5276,295" + b",100000000.00" * 6 + b",2085,532,-16548" + b",0" * 6 + b"\r\n"
+
+        records = parser.feed(line * 3)
+        self.assertEqual(len(records), 3)
+        self.assertEqual(records["time"][0], 208541)
+        self.assertEqual(records["strength"][0, 2], -16548)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+
+# Headless serial recorder. Reads the port in large chunks and keeps them in
+# memory until the flush policy (bytes or seconds) says to write. Nothing is
+# fsync'd and nothing is echoed per line, so a slow terminal or disk can't
+# back up the UART. Files rotate on size or age, always on a line boundary.
+#
+#   ./record.py /dev/ttyACM1                         # text, one file
+#   ./record.py /dev/ttyACM1 -o imu --rotate-time 3600
+#   ./record.py /dev/ttyACM0 --format cap --fields 19
+
+import argparse, os, sys, time, warnings
+import numpy as np
+import unittest
+
+import capture
+
+class TextSink():
+    suffix = ".log"
+
+    def __init__(self, path):
+        self.f = open(path, "ab", buffering=0)
+        self.size = self.f.tell()
+
+    def write(self, data):
+        self.f.write(data)
+        self.size += len(data)
+
+    def close(self):
+        self.f.close()
+
+# Whitespace or comma separated numeric lines as capture records. Lines with
+# a different field count, or that aren't numbers, are counted in `malformed`
+# and left out.
+class CaptureSink():
+    suffix = ".cap"
+
+    def __init__(self, path, fields):
+        self.dtype = capture.dtype_for(fields)
+        self.fields = fields
+        self.malformed = 0
+        self.f = open(path, "wb", buffering=0)
+        self.f.write(capture.header(self.dtype))
+        self.size = self.f.tell()
+
+    def write(self, data):
+        lines = [l for l in data.replace(b",", b" ").replace(b"\t", b" ").split(b"\n") if l.strip()]
+        good = [l for l in lines if len(l.split()) == self.fields]
+        self.malformed += len(lines) - len(good)
+        if not good: return
+
+        values = self.parse(b" ".join(good))
+        if values.size != len(good) * self.fields: values = self.parse_each(good)
+        if not values.size: return
+
+        values = values.reshape(-1, self.fields)
+        records = capture.to_records(values).tobytes()
+        self.f.write(records)
+        self.size += len(records)
+
+    def parse(self, text):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            try:               return np.fromstring(text, dtype=np.float64, sep=" ")
+            except ValueError: return np.zeros(0)
+
+    # slow path, only taken when a line with the right field count didn't parse
+    def parse_each(self, lines):
+        rows = []
+        for line in lines:
+            row = self.parse(line)
+            if row.size == self.fields: rows.append(row)
+            else:                       self.malformed += 1
+        return np.array(rows, dtype=np.float64).reshape(-1)
+
+    def close(self):
+        self.f.close()
+
+class Recorder():
+    def __init__(self, ser, prefix, fmt="text", fields=None, flush_bytes=1 << 20, flush_interval=1.0,
+                 rotate_bytes=None, rotate_interval=None, chunk=1 << 16, clock=time.monotonic):
+        self.ser = ser
+        self.prefix = prefix
+        self.fmt = fmt
+        self.fields = fields
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+        self.rotate_bytes = rotate_bytes
+        self.rotate_interval = rotate_interval
+        self.chunk = chunk
+        self.clock = clock
+
+        self.buffer = bytearray()
+        self.sink = None
+        self.files = []
+        self.bytes_read = 0
+        self.closed_malformed = 0  # from files already rotated out
+        self.last_flush = self.opened = clock()
+
+    # malformed lines over all files so far, the sink's own count restarts with each file
+    @property
+    def malformed(self):
+        return self.closed_malformed + getattr(self.sink, "malformed", 0)
+
+    def open(self):
+        if self.sink:
+            self.closed_malformed += getattr(self.sink, "malformed", 0)
+            self.sink.close()
+
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        suffix = CaptureSink.suffix if self.fmt == "cap" else TextSink.suffix
+        path, n = f"{self.prefix}-{stamp}{suffix}", 1
+        while os.path.exists(path) or path in self.files:
+            path, n = f"{self.prefix}-{stamp}-{n}{suffix}", n + 1
+
+        self.sink = CaptureSink(path, self.fields) if self.fmt == "cap" else TextSink(path)
+        self.files.append(path)
+        self.opened = self.clock()
+
+    def due_rotation(self):
+        if self.rotate_bytes and self.sink.size >= self.rotate_bytes: return True
+        if self.rotate_interval and self.clock() - self.opened >= self.rotate_interval: return True
+        return False
+
+    def flush(self, force=False):
+        # only ever write whole lines, the rest waits for the next chunk
+        end = len(self.buffer) if force else self.buffer.rfind(b"\n") + 1
+        if end <= 0: return
+
+        if self.sink is None or self.due_rotation(): self.open()
+        self.sink.write(bytes(self.buffer[:end]))
+        del self.buffer[:end]
+        self.last_flush = self.clock()
+
+    def poll(self):
+        data = self.ser.read(max(1, min(self.ser.in_waiting, self.chunk)))
+        if data:
+            self.buffer += data
+            self.bytes_read += len(data)
+
+        if len(self.buffer) >= self.flush_bytes or self.clock() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def close(self):
+        self.flush(force=True)
+        if self.sink:
+            self.closed_malformed += getattr(self.sink, "malformed", 0)
+            self.sink.close()
+        self.sink = None
+
+def main(argv=None):
+    import serial
+
+    ap = argparse.ArgumentParser(description="record a serial port to disk")
+    ap.add_argument("port"), ap.add_argument("baud", type=int, nargs="?", default=115200)
+    ap.add_argument("-o", "--output", default="log", help="file prefix, a timestamp is appended")
+    ap.add_argument("--format", choices=["text", "cap"], default="text")
+    ap.add_argument("--fields", type=int, help="numeric fields per line (needed for --format cap)")
+    ap.add_argument("--flush-bytes", type=int, default=1 << 20)
+    ap.add_argument("--flush-interval", type=float, default=1.0, help="seconds")
+    ap.add_argument("--rotate-size", type=float, help="MiB per file")
+    ap.add_argument("--rotate-time", type=float, help="seconds per file")
+    ap.add_argument("--status", type=float, default=10.0, help="seconds between status lines, 0 for none")
+    args = ap.parse_args(argv)
+    if args.format == "cap" and not args.fields: ap.error("--format cap needs --fields")
+
+    rotate_bytes = int(args.rotate_size * (1 << 20)) if args.rotate_size else None
+    recorder = None
+    while True:
+        try:
+            print(f"Opening {args.port}...", file=sys.stderr)
+            ser = serial.Serial(args.port, args.baud, timeout=0.1)
+            recorder = recorder or Recorder(ser, args.output, args.format, args.fields, args.flush_bytes,
+                                            args.flush_interval, rotate_bytes, args.rotate_time)
+            recorder.ser = ser
+
+            last_status = time.monotonic()
+            while True:
+                recorder.poll()
+                if args.status and time.monotonic() - last_status >= args.status:
+                    last_status = time.monotonic()
+                    print(f"{recorder.bytes_read} bytes, {len(recorder.files)} file(s), "
+                          f"{recorder.malformed} malformed, writing {recorder.files[-1] if recorder.files else '-'}",
+                          file=sys.stderr)
+        except KeyboardInterrupt:
+            print("User interrupted. Exiting.", file=sys.stderr)
+            break
+        except serial.SerialException as e:
+            print("Serial error:", e, file=sys.stderr)
+            if recorder: recorder.flush()
+            time.sleep(2)
+
+    if recorder: recorder.close()
+
+
+class RecorderTest(unittest.TestCase):
+
+    class FakeSerial():
+        def __init__(self, data, chunk):
+            self.data, self.chunk = data, chunk
+        @property
+        def in_waiting(self): return min(len(self.data), self.chunk)
+        def read(self, n):
+            out, self.data = self.data[:n], self.data[n:]
+            return out
+
+    class FakeClock():
+        def __init__(self): self.t = 0.0
+        def __call__(self): return self.t
+
+    def setUp(self):
+        import tempfile
+        self.dir = tempfile.TemporaryDirectory()
+        self.prefix = os.path.join(self.dir.name, "log")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def lines(self, n):
+        return b"".join(f"{i}\t{i * 2}\t{i * 3}\n".encode() for i in range(n))
+
+    def run_recorder(self, data, **kwargs):
+        clock = self.FakeClock()
+        recorder = Recorder(self.FakeSerial(data, 37), self.prefix, clock=clock, **kwargs)
+        while recorder.ser.data:
+            recorder.poll()
+            clock.t += 0.1
+        recorder.close()
+        return recorder
+
+    def test_text_round_trip(self):
+        data = self.lines(1000)
+        recorder = self.run_recorder(data, flush_bytes=4096)
+
+        self.assertEqual(len(recorder.files), 1)
+        with open(recorder.files[0], "rb") as f: self.assertEqual(f.read(), data)
+
+    def test_rotates_on_line_boundaries(self):
+        data = self.lines(1000)
+        recorder = self.run_recorder(data, flush_bytes=512, rotate_bytes=2048)
+
+        self.assertGreater(len(recorder.files), 3)
+        joined = b""
+        for path in recorder.files:
+            with open(path, "rb") as f: chunk = f.read()
+            self.assertTrue(chunk.endswith(b"\n"))
+            joined += chunk
+        self.assertEqual(joined, data)
+
+    def test_rotates_on_time(self):
+        recorder = self.run_recorder(self.lines(1000), flush_interval=0.5, rotate_interval=5.0)
+        self.assertGreater(len(recorder.files), 1)
+
+    def test_capture_format(self):
+        data = self.lines(500) + b"broken line\n" + self.lines(10)
+        recorder = self.run_recorder(data, fmt="cap", fields=3, flush_bytes=1024, rotate_bytes=4096)
+
+        records = np.concatenate([capture.load(p)["values"] for p in recorder.files])
+        expected = np.concatenate([np.arange(500), np.arange(10)])
+        np.testing.assert_array_equal(records[:, 2], expected * 3)
+
+    def test_capture_skips_non_numeric_lines(self):
+        data = b"Booting radar now\n" + self.lines(300) + b"1 2 x\n" + self.lines(300)
+        recorder = self.run_recorder(data, fmt="cap", fields=3, flush_bytes=1024, rotate_bytes=2048)
+
+        self.assertGreater(len(recorder.files), 2)
+        records = np.concatenate([capture.load(p)["values"] for p in recorder.files])
+        self.assertEqual(len(records), 600)
+        self.assertEqual(recorder.malformed, 2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
+import os
 import sys
-import json
 import math
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QGraphicsView, 
                             QGraphicsScene, QVBoxLayout, QWidget, QLabel, 
@@ -7,232 +7,13 @@ from PyQt5.QtWidgets import (QApplication, QMainWindow, QGraphicsView,
 from PyQt5.QtCore import Qt, QTimer, QPointF, QObject, pyqtSignal
 from PyQt5.QtGui import QPainter, QPen, QBrush, QPolygonF, QColor
 
-#For ease of implementation a line wiil be initiliased with a single point
-class IncrementalLinearRegression:
-    def __init__(self,start_point_x,start_point_y,scene,line_radius=50):
-        self.n = 0
-        self.Sx = 0.0
-        self.Sy = 0.0
-        self.Sxx = 0.0
-        self.Sxy = 0.0
-        self.slope = 0.0
-        self.intercept = 0.0
-        self.end_points = [(start_point_x,start_point_y),(start_point_x,start_point_y)]
-        self.line_radius = line_radius
-        self.line_item = None
-        self.scene = scene
-        self.initial_x = start_point_x
-        self.initial_y = start_point_y
-        self.angle_tolerance = 1
-        self.starting_angle_tolerance = 90
-        self.slope_learning_rate = 1
-        self.number_of_points_for_established_trend = 10
-
-    def add_point(self, x, y):
-        self.n += 1
-        self.Sx += x
-        self.Sy += y
-        self.Sxx += x * x
-        self.Sxy += x * y
-
-        if self.n >= 2:
-            denominator = self.n * self.Sxx - self.Sx ** 2
-            if denominator != 0:
-                new_slope = (self.n * self.Sxy - self.Sx * self.Sy) / denominator
-                if self.n>2:
-                    current_angle = math.atan(self.slope)
-                    new_angle = math.atan(new_slope)
-                    angle_diff = abs(current_angle - new_angle)
-
-                    base_threshold = math.radians(self.starting_angle_tolerance)
-                    k = self.slope_learning_rate
-                    min_angle_tolerance = math.radians(self.angle_tolerance)  
-                    tolerance = max(min_angle_tolerance, base_threshold * math.exp(-k * (self.n - 2)))
-
-                    if angle_diff > tolerance:
-                        return False  
-
-                self.slope = new_slope
-                self.intercept = (self.Sy - self.slope * self.Sx) / self.n
-            
-        if self.n > 2:
-            self.update_end_points(x,y,self.n>self.number_of_points_for_established_trend)
-        else:
-            self.end_points[1] = (x,y)
-        
-        if self.n>=2:
-            self.draw_line()
-        return True
-
-    def predict(self, x):
-        return self.slope * x + self.intercept
-    
-    def predict_x(self, y):
-        if self.slope != 0:
-            return (y - self.intercept) / self.slope
-        else:
-            return self.initial_x
-    
-    def in_boundary(self,x,y):
-        (x0, y0), (x1, y1) = self.end_points
-
-        if x > min(x0, x1) and x < max(x0, x1) and y > min(y0, y1) and y < max(y0, y1):
-            return True
-        else:
-            return False
-        
-    def find_relevant_end_point(self,x,y):
-        distance = math.sqrt((x - self.end_points[0][0]) ** 2 + (y - self.end_points[0][1]) ** 2),math.sqrt((x - self.end_points[1][0]) ** 2 + (y - self.end_points[1][1]) ** 2)
-        index = 0 if distance[0] < distance[1] else 1
-        return index
-    
-    def in_line_radius(self,x,y,multiplier=1):
-        line_radius = self.line_radius*multiplier
-        if self.n >= 2:
-            if self.in_boundary(x,y):
-                distance = math.sqrt((x - self.predict_x(y)) ** 2 + (y - self.predict(x)) ** 2)
-            else:
-                distance = min(math.sqrt((x - self.end_points[0][0]) ** 2 + (y - self.end_points[0][1]) ** 2),math.sqrt((x - self.end_points[1][0]) ** 2 + (y - self.end_points[1][1]) ** 2))
-        else:   
-            distance = math.sqrt((x - self.initial_x) ** 2 + (y - self.initial_y) ** 2) 
-
-        
-        return distance < line_radius
-        
-    def update_end_points(self, x, y,established_trend=False): 
-        if (self.in_boundary(x,y))==False:
-            relevant_end_point = self.find_relevant_end_point(x, y)
-        
-            x1, y1 = self.end_points[relevant_end_point]
-            
-            # Handle the case where the x-values are equal to avoid division by zero
-            if x == x1:
-                slope_to_new_point = float('inf')  # or use None or a special value for vertical line
-            else:
-                slope_to_new_point = (y - y1) / (x - x1)
-            accept = False
-            if established_trend:
-                current_angle = math.atan(self.slope)
-                new_angle = math.atan(slope_to_new_point)
-                angle_diff = abs(current_angle - new_angle)
-
-                if angle_diff<math.radians(60):
-                    accept = True
-
-            if not established_trend or accept:
-                if (self.slope ** 2) < 1:
-                    new_y = self.predict(x)
-                    new_point = (self.predict_x(new_y), new_y)
-                else:
-                    new_x = self.predict_x(y)
-                    new_point = (new_x, self.predict(new_x))
-                self.end_points[relevant_end_point] = new_point
-                
-                        
-
-    def draw_line(self): 
-        self.erase_line()
-
-        wall_pen = QPen(QColor(0, 0, 255), 2)  # Blue
-
-        (x0, y0), (x1, y1) = self.end_points
-        self.line_item = self.scene.addLine(x0, y0, x1, y1, wall_pen)
-    
-    def erase_line(self):
-        if self.line_item:
-            self.scene.removeItem(self.line_item)
-            self.line_item = None
-
-    def combine_lines(self,other):
-        self.n += other.n
-        self.Sx += other.Sx
-        self.Sy += other.Sy
-        self.Sxx += other.Sxx
-        self.Sxy += other.Sxy
-
-        denominator = self.n * self.Sxx - self.Sx**2
-        if denominator != 0:
-            self.slope = (self.n * self.Sxy - self.Sx * self.Sy) / denominator
-            self.intercept = (self.Sy - self.slope * self.Sx) / self.n
-
-        other.erase_line()
-        self.update_end_points(other.end_points[0][0],other.end_points[0][1])
-        self.update_end_points(other.end_points[1][0],other.end_points[1][1])
-        self.draw_line()
-    
-    def can_combine_lines(self,other):
-        temp_n = self.n + other.n
-        tempSx = self.Sx + other.Sx
-        tempSy = self.Sy + other.Sy
-        tempSxx = self.Sxx + other.Sxx
-        tempSxy = self.Sxy + other.Sxy
-
-        if temp_n >= 2:
-            denominator = temp_n * tempSxx - tempSx ** 2
-            if denominator != 0:
-                new_slope = (temp_n * tempSxy - tempSx * tempSy) / denominator
-
-                self_current_angle = math.atan(self.slope)
-                other_current_angle = math.atan(other.slope)
-                new_angle = math.atan(new_slope)
-                self_angle_diff = abs(self_current_angle - new_angle)
-                other_angle_diff = abs(other_current_angle - new_angle)
-
-                base_threshold = math.radians(self.starting_angle_tolerance)
-                k = self.slope_learning_rate
-                min_angle_tolerance = math.radians(self.angle_tolerance)
-                tolerance = max(min_angle_tolerance, base_threshold * math.exp(-k * (temp_n - 2)))
-
-                if self_angle_diff > tolerance or other_angle_diff >tolerance:
-                    return False
-        
-        return True
-    
-    # returns true if the "other" line is merged into the "self" line
-    def connect_lines(self, other):
-        min_distance = float('inf')
-        closest_pair = None
-
-        for end_self in self.end_points:
-            for end_other in other.end_points:
-                distance = math.sqrt((end_self[0] - end_other[0]) ** 2 + (end_self[1] - end_other[1]) ** 2)
-                if distance < min_distance:
-                    min_distance = distance
-                    closest_pair = (end_self, end_other)
-        
-        if self.in_line_radius(closest_pair[1][0],closest_pair[1][1]):
-            if self.can_combine_lines(other):
-                self.combine_lines(other)
-                return True
-            
-        if other.n<2 and self.n<2:
-            return False
-        
-        if self.slope == other.slope:
-            return False
-
-        # Calculate intersection point of two lines: y = m1*x + c1 and y = m2*x + c2
-        try:
-            x_intersect = (other.intercept - self.intercept) / (self.slope - other.slope)
-            y_intersect = self.slope * x_intersect + self.intercept
-            intersection_point = (x_intersect, y_intersect)
-        except ZeroDivisionError:
-            return False
-        if self.in_line_radius(intersection_point[0],intersection_point[1],multiplier=2) and other.in_line_radius(intersection_point[0],intersection_point[1],multiplier = 2) and other.n>5 and self.n>5:
-            self.add_point(intersection_point[0],intersection_point[1])
-            other.add_point(intersection_point[0],intersection_point[1])
-        return False
-
-
-class DataConnection(QObject):
-    """Abstract base class for data connections"""
-    data_received = pyqtSignal(dict)
-    
-    def connect(self):
-        raise NotImplementedError
-        
-    def disconnect(self):
-        raise NotImplementedError
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+from models.wallModel import WallMap
+from views.wallRenderer import WallRenderer
+from views.mapItems import PointCloudItem, trail_item
+from models.pointCloud import PointCloud
+from controllers.frameScheduler import FrameScheduler
+from controllers.connections import DataConnection, SerialConnection
 
 class MinimapApp(QMainWindow):
     def __init__(self):
@@ -244,6 +25,8 @@ class MinimapApp(QMainWindow):
         self.view = QGraphicsView()
         self.scene = QGraphicsScene()
         self.view.setScene(self.scene)
+        self.wall_renderer = WallRenderer(self.scene)
+        self.add_map_items()
         self.view.setRenderHint(QPainter.Antialiasing)
         self.view.setSceneRect(-400, -400, 800, 800)  # Center at (0,0)
         
@@ -251,12 +34,14 @@ class MinimapApp(QMainWindow):
         self.status_label = QLabel("Disconnected")
         self.data_count_label = QLabel("Packets: 0")
         self.lost_count_label = QLabel("Lost: 0")
+        self.backlog_label = QLabel("Backlog: 0")
         
         status_bar = QWidget()
         status_layout = QHBoxLayout()
         status_layout.addWidget(self.status_label)
         status_layout.addWidget(self.data_count_label)
         status_layout.addWidget(self.lost_count_label)
+        status_layout.addWidget(self.backlog_label)
         status_bar.setLayout(status_layout)
         
         # Set up central widget
@@ -281,27 +66,31 @@ class MinimapApp(QMainWindow):
         # Connection
         self.connection = None
 
-        self.lines = []
+        self.wall_map = WallMap()
+        self.point_cloud = PointCloud()
+
+        # Packets are queued as they arrive and drawn at most 30 times a second
+        self.scheduler = FrameScheduler(self.process_data, self.update_display, fps=30, parent=self)
         
     def set_connection(self, connection):
         """Set the data connection to use"""
         if self.connection:
+            self.connection.status_changed.disconnect()
             self.connection.disconnect()
             self.connection.data_received.disconnect()
         
         self.connection = connection
-        self.connection.data_received.connect(self.process_data)
+        self.connection.data_received.connect(self.scheduler.push)
+        self.connection.status_changed.connect(self.status_label.setText)
         self.connection.connect()
-        self.status_label.setText("Connected")
+        self.status_label.setText(self.connection.status)
         
     def process_data(self, data):
-        """Process incoming JSON data"""
+        """Apply one JSON packet to the model, drawing is left to update_display"""
         try:
             # Update packet counters
             self.packet_count += 1
             self.lost_packets += data.get("packets_lost", 0)
-            self.data_count_label.setText(f"Packets: {self.packet_count}")
-            self.lost_count_label.setText(f"Lost: {self.lost_packets}")
             
             # Store IMU data
             self.imu_data.append(data)
@@ -309,7 +98,7 @@ class MinimapApp(QMainWindow):
             # Store radar distance if valid
             if "distance" in data and 0 < data["distance"] < 1000:
                 self.radar_data.append((data["pitch"], data["yaw"], data["distance"]))
-                print(f"Added radar point: pitch={data["pitch"]}, yaw={data['yaw']}, distance={data['distance']}")  # Debug
+                print(f"Added radar point: pitch={data['pitch']}, yaw={data['yaw']}, distance={data['distance']}")  # Debug
                 
         
             if len(self.imu_data) > 100:
@@ -335,17 +124,14 @@ class MinimapApp(QMainWindow):
             if len(self.person_trail) > 50:
                 self.person_trail.pop(0)
             
-            self.update_display()
+            if "distance" in data and 0 < data["distance"] < 1000:
+                self.map_radar_point()
                 
         except Exception as e:
             print(f"Error processing data: {e}")
     
-    def update_display(self):
-        """Update the minimap display"""
-        
-        # Draw radar walls (blue)
-        wall_pen = QPen(QColor(0, 0, 255), 2)
-        wall_brush = QBrush(QColor(0, 0, 255, 100))  # More opaque blue
+    def map_radar_point(self):
+        """Add the newest radar reading to the point cloud and wall model"""
         pitch= self.radar_data[-1][0]
         pitch_radians = -math.radians(pitch)
         yaw = self.radar_data[-1][1]
@@ -356,45 +142,32 @@ class MinimapApp(QMainWindow):
         x = self.current_position.x() + scaled_distance * math.cos(pitch_radians) * math.cos(yaw_radians)
         y = self.current_position.y() + scaled_distance * math.cos(pitch_radians) * math.sin(yaw_radians)
           
-        # Draw wall point (larger size: 10x10 pixels)
-        self.scene.addEllipse(x-5, y-5, 10, 10, wall_pen, wall_brush)
-        
-        matched = False
-        for line in self.lines:
-            if line.in_line_radius(x, y):
-                matched = True
-                line.add_point(x, y)
-                
+        # Wall point, one per 5px cell
+        self.point_cloud.add(x, y)
+        self.wall_map.add_point(x, y)
 
-        if not matched:
-            print("new line")
-            new_line = IncrementalLinearRegression(start_point_x=x,start_point_y=y,scene=self.scene)
-            new_line.add_point(x, y)
-            self.lines.append(new_line)
+    def update_display(self):
+        """Redraw the status bar and minimap, called once per frame by the scheduler"""
+        self.data_count_label.setText(f"Packets: {self.packet_count}")
+        self.lost_count_label.setText(f"Lost: {self.lost_packets}")
+        self.backlog_label.setText(f"Backlog: {self.scheduler.backlog}  Rate: {self.scheduler.rate:.0f}/s")
 
-        resolved_lines = []
-        i =0
-        while len(resolved_lines)<len(self.lines):
-            j = i+1
-            while j<len(self.lines):
-                removed = self.lines[i].connect_lines(self.lines[j])
-                if removed:
-                    self.lines.pop(j)
-                else:
-                    j=j+1
-            resolved_lines.append(self.lines[i])
-            i+=1
-        self.lines = resolved_lines
+        self.cloud_item.sync(self.point_cloud)
+        self.wall_renderer.sync(self.wall_map)
 
         # Draw person trail (green)
-        if len(self.person_trail) > 1:
-            trail_pen = QPen(QColor(0, 255, 0, 150), 2)
-            path = QPolygonF(self.person_trail)
-            self.scene.addPolygon(path, trail_pen)
+        self.trail_item.set_points([(p.x(), p.y()) for p in self.person_trail])
         
         # Draw person (red circle with direction arrow)
         self.draw_person()
         
+    def add_map_items(self):
+        """Radar points and trail are one scene item each, updated in place"""
+        self.cloud_item = PointCloudItem()
+        self.trail_item = trail_item(polyline=True)
+        self.scene.addItem(self.cloud_item)
+        self.scene.addItem(self.trail_item)
+
     def draw_person(self):
         """Draw the person with direction arrow, removing previous graphics"""
         # Remove previous person graphics if they exist
@@ -456,46 +229,6 @@ class MinimapApp(QMainWindow):
         head = self.scene.addPolygon(arrow_head, arrow_pen, QBrush(Qt.white))
         self.person_graphics.append(head)
 
-class SerialConnection(DataConnection):
-    """Serial connection implementation"""
-    def __init__(self, port, baudrate):
-        super().__init__()
-        self.port = port
-        self.baudrate = baudrate
-        self.serial = None
-        
-    def connect(self):
-        try:
-            import serial
-            self.serial = serial.Serial(self.port, self.baudrate, timeout=1)
-            self.status = "Connected"
-            
-            # Start reading thread
-            self.read_timer = QTimer()
-            self.read_timer.timeout.connect(self.read_data)
-            self.read_timer.start(10)
-            
-        except Exception as e:
-            print(f"Serial connection error: {e}")
-            self.status = "Connection failed"
-            
-    def disconnect(self):
-        if self.serial and self.serial.is_open:
-            self.serial.close()
-        if hasattr(self, 'read_timer'):
-            self.read_timer.stop()
-        self.status = "Disconnected"
-            
-    def read_data(self):
-        if self.serial and self.serial.in_waiting:
-            try:
-                line = self.serial.readline().decode('utf-8').strip()
-                if line:
-                    data = json.loads(line)
-                    self.data_received.emit(data)
-            except Exception as e:
-                print(f"Error reading serial data: {e}")
-
 class SimulatedConnection(DataConnection):
     """Simulated data connection for testing"""
     def __init__(self):
@@ -506,9 +239,11 @@ class SimulatedConnection(DataConnection):
         
     def connect(self):
         self.timer.start(100)
+        self.set_status("Connected")
         
     def disconnect(self):
         self.timer.stop()
+        self.set_status("Disconnected")
         
     def generate_data(self):
         self.counter += 1
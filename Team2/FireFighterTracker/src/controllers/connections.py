@@ -0,0 +1,226 @@
+import bisect
+import json
+import time
+
+from PyQt5.QtCore import QObject, QThread, QTimer, pyqtSignal
+
+
+class DataConnection(QObject):
+    """Abstract base class for data connections
+
+    data_received carries one packet dict, or a list of them from connections
+    that read in batches. FrameScheduler.push takes either. status_changed
+    carries the new status whenever it changes, including when the link
+    drops on its own.
+    """
+    data_received = pyqtSignal(object)
+    status_changed = pyqtSignal(str)
+    status = "Disconnected"
+
+    def set_status(self, status):
+        if status != self.status:
+            self.status = status
+            self.status_changed.emit(status)
+
+    def connect(self):
+        raise NotImplementedError
+
+    def disconnect(self):
+        raise NotImplementedError
+
+
+class LineParser:
+    """Turns a byte stream of newline separated JSON into packet dicts.
+
+    A partial line at the end of a chunk is kept for the next one. Each
+    chunk's lines are parsed with one json.loads call, falling back to one
+    per line only if something in the chunk is malformed.
+    """
+    def __init__(self):
+        self.tail = b""
+        self.bad_lines = 0
+
+    def feed(self, chunk):
+        lines = (self.tail + chunk).split(b"\n")
+        self.tail = lines.pop()
+        lines = [line.strip() for line in lines]
+        lines = [line for line in lines if line]
+        if not lines:
+            return []
+
+        try:
+            packets = json.loads(b"[" + b",".join(lines) + b"]")
+            if all(isinstance(packet, dict) for packet in packets):
+                return packets
+        except ValueError:
+            pass
+
+        packets = []
+        for line in lines:
+            try:
+                packet = json.loads(line)
+            except ValueError:
+                packet = None
+            if isinstance(packet, dict):
+                packets.append(packet)
+            else:
+                self.bad_lines += 1
+                print(f"Skipping malformed line: {line[:80]!r}")
+        return packets
+
+
+class SerialReader(QThread):
+    """Reads an open serial port until stopped, emitting lists of packets.
+
+    Each read takes everything the driver has buffered (blocking up to the
+    port timeout for the first byte), so the packets per emit grow with the
+    link rate instead of being capped by a poll interval. If a read fails
+    (the device was unplugged, say) the thread emits failed and stops.
+    """
+    packets_read = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, serial, chunk_size=65536, parent=None):
+        super().__init__(parent)
+        self.serial = serial
+        self.chunk_size = chunk_size
+        self.parser = LineParser()
+        self.running = True
+
+    def run(self):
+        while self.running:
+            try:
+                chunk = self.serial.read(min(max(self.serial.in_waiting, 1), self.chunk_size))
+            except Exception as e:
+                print(f"Serial read error: {e}")
+                self.failed.emit(str(e))
+                break
+            if chunk:
+                packets = self.parser.feed(chunk)
+                if packets:
+                    self.packets_read.emit(packets)
+
+    def stop(self):
+        self.running = False
+        self.wait()
+
+
+class SerialConnection(DataConnection):
+    """Serial connection, read and parsed on a background thread"""
+    def __init__(self, port, baudrate, timeout=0.1):
+        super().__init__()
+        self.port = port
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self.serial = None
+        self.reader = None
+
+    def connect(self):
+        try:
+            import serial
+            # serial_for_url also opens plain port names, and loop:// for testing
+            self.serial = serial.serial_for_url(self.port, self.baudrate, timeout=self.timeout)
+            self.set_status("Connected")
+
+            self.reader = SerialReader(self.serial)
+            self.reader.packets_read.connect(self.data_received)
+            self.reader.failed.connect(self.reader_failed)
+            self.reader.start()
+
+        except Exception as e:
+            print(f"Serial connection error: {e}")
+            self.set_status("Connection failed")
+
+    def reader_failed(self, error):
+        """The reader thread lost the port, close what is left of it"""
+        self.disconnect()
+        self.set_status("Connection failed")
+
+    def disconnect(self):
+        # the reader exits within one port timeout, then the port can close
+        if self.reader:
+            self.reader.stop()
+            self.reader = None
+        if self.serial and self.serial.is_open:
+            self.serial.close()
+        self.set_status("Disconnected")
+
+
+class ReplayConnection(DataConnection):
+    """Plays back a JSON lines capture, such as Team4's logs/raw_data_*.json
+    from helper.py or the simulated_data_*.json files from sim.py.
+
+    Packets are released on their recorded timestamps, `speed` times faster
+    than real time, in one batch per timer tick. speed=None hands over the
+    whole capture at once, so it runs as fast as the page can ingest it.
+    Pauses longer than `max_gap` seconds (a device restart, say) are
+    shortened to it.
+    """
+    finished = pyqtSignal()
+
+    def __init__(self, filename, speed=1.0, interval=10, max_gap=1.0):
+        super().__init__()
+        self.filename = filename
+        self.speed = speed
+        self.max_gap = max_gap
+        self.packets = []
+        self.times = []
+        self.sent = 0
+        self.started = None
+
+        self.timer = QTimer()
+        self.timer.setInterval(0 if speed is None else interval)
+        self.timer.timeout.connect(self.send_due)
+
+    def load(self):
+        parser = LineParser()
+        with open(self.filename, "rb") as f:
+            self.packets = parser.feed(f.read() + b"\n")
+
+        # seconds from the first packet, from the device's millisecond timestamps
+        self.times = []
+        now = 0.0
+        last = None
+        for packet in self.packets:
+            timestamp = packet.get("timestamp")
+            if isinstance(timestamp, (int, float)):
+                if last is not None:
+                    now += min(max((timestamp - last) / 1000.0, 0.0), self.max_gap)
+                last = timestamp
+            self.times.append(now)
+
+    def connect(self):
+        try:
+            self.load()
+        except OSError as e:
+            print(f"Replay error: {e}")
+            self.set_status("Connection failed")
+            return
+
+        self.sent = 0
+        self.started = time.perf_counter()
+        self.set_status("Connected")
+        self.timer.start()
+
+    def disconnect(self):
+        self.timer.stop()
+        self.set_status("Disconnected")
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started if self.started is not None else 0.0
+
+    def send_due(self):
+        if self.speed is None:
+            end = len(self.packets)
+        else:
+            end = bisect.bisect_right(self.times, self.elapsed * self.speed, lo=self.sent)
+
+        if end > self.sent:
+            self.data_received.emit(self.packets[self.sent:end])
+            self.sent = end
+
+        if self.sent == len(self.packets):
+            self.timer.stop()
+            self.set_status("Finished")
+            self.finished.emit()
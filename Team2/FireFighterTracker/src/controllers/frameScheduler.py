@@ -0,0 +1,67 @@
+import time
+from collections import deque
+
+from PyQt5.QtCore import QObject, QTimer
+
+
+class FrameScheduler(QObject):
+    """Decouples packet arrival from drawing.
+
+    Connect a connection's data_received to push(), which only queues the
+    packet (or list of packets). A timer at `fps` applies queued packets to
+    the model with `ingest`, for at most `budget` of each frame, and then
+    calls `render` once if anything was applied. Packets that didn't fit stay
+    queued (`backlog`) for the next frame, so a burst from the transceiver
+    delays the map a little instead of freezing the window.
+
+    `rate` is the packets applied per second, measured over about a second.
+    """
+    def __init__(self, ingest, render, fps=30, budget=0.6, parent=None, clock=time.perf_counter):
+        super().__init__(parent)
+        self.ingest = ingest
+        self.render = render
+        self.budget = budget / fps
+        self.clock = clock
+        self.pending = deque()
+        self.applied = 0
+        self.rate = 0.0
+        self.rate_start = clock()
+        self.rate_applied = 0
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.frame)
+        self.timer.start(round(1000 / fps))
+
+    @property
+    def backlog(self):
+        return len(self.pending)
+
+    def push(self, data):
+        if isinstance(data, list):
+            self.pending.extend(data)
+        else:
+            self.pending.append(data)
+
+    def frame(self):
+        start = self.clock()
+        applied = 0
+        # always make some progress, even if one packet takes the whole budget
+        while self.pending and (applied == 0 or self.clock() - start < self.budget):
+            self.ingest(self.pending.popleft())
+            applied += 1
+
+        self.applied += applied
+        now = self.clock()
+        if now - self.rate_start >= 1.0:
+            self.rate = (self.applied - self.rate_applied) / (now - self.rate_start)
+            self.rate_start = now
+            self.rate_applied = self.applied
+
+        if applied:
+            self.render()
+
+    def clear(self):
+        self.pending.clear()
+
+    def stop(self):
+        self.timer.stop()
@@ -1,6 +1,12 @@
+import hashlib
+import os
+import zipfile
+
 import cv2
 import numpy as np
 
+CACHE_VERSION = 1  # bump when floorplan_to_maze's output changes
+
 def floorplan_to_maze(image_path, height=None, width=None, blur_effect=100):
 
     # Load the image
@@ -29,3 +35,63 @@ def floorplan_to_maze(image_path, height=None, width=None, blur_effect=100):
     #print(np.array2string(maze, threshold=np.inf))
 
     return maze
+
+
+_file_hashes = {}
+
+
+def file_hash(path):
+    """sha256 of a file's content, remembered while its size and mtime stay the same"""
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if key not in _file_hashes:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        _file_hashes[key] = digest.hexdigest()
+    return _file_hashes[key]
+
+
+def maze_pyramid(maze, levels=4):
+    """The maze followed by copies halved in size, each cell a wall if any of
+    the four below it is, so walls never disappear when zoomed out"""
+    pyramid = [maze]
+    while len(pyramid) < levels and min(pyramid[-1].shape) > 1:
+        level = pyramid[-1]
+        h, w = level.shape
+        level = np.pad(level, ((0, h % 2), (0, w % 2)))
+        pyramid.append(level.reshape((h + 1) // 2, 2, (w + 1) // 2, 2).max(axis=(1, 3)))
+    return pyramid
+
+
+def maze_cache_path(image_path, height=None, width=None, blur_effect=100, levels=4):
+    """Where load_maze keeps the maze for these settings, next to the image"""
+    settings = f"{CACHE_VERSION}:{file_hash(image_path)}:{height}:{width}:{blur_effect}:{levels}"
+    key = hashlib.sha256(settings.encode()).hexdigest()[:16]
+    return f"{os.path.splitext(image_path)[0]}.maze-{key}.npz"
+
+
+def load_maze(image_path, height=None, width=None, blur_effect=100, levels=4):
+    """floorplan_to_maze and its maze_pyramid, cached on disk.
+
+    The cache is a compressed .npz next to the image, named by a hash of the
+    image's content and the settings, so opening a known floor plan again
+    or changing settings that don't affect the maze skips OpenCV. If the
+    folder can't be written to, the maze is just not cached.
+    """
+    cache_path = maze_cache_path(image_path, height, width, blur_effect, levels)
+    try:
+        with np.load(cache_path) as cached:
+            return [cached[f"level{i}"] for i in range(len(cached.files))]
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+        pass
+
+    pyramid = maze_pyramid(floorplan_to_maze(image_path, height, width, blur_effect), levels)
+    try:
+        partial = cache_path + ".part.npz"
+        np.savez_compressed(partial, **{f"level{i}": level for i, level in enumerate(pyramid)})
+        os.replace(partial, cache_path)
+    except OSError as e:
+        print(f"Log: Could not cache maze: {e}")
+    return pyramid
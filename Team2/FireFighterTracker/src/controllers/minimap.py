@@ -1,8 +1,99 @@
+import math
+from collections import OrderedDict
+
+import numpy as np
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QGraphicsView, QGraphicsScene, 
-                            QGraphicsRectItem, QGraphicsEllipseItem)
-from PyQt5.QtGui import QBrush
-from PyQt5.QtCore import Qt, QEvent
-from controllers.imageToArray import floorplan_to_maze
+                            QGraphicsItem, QGraphicsEllipseItem, QStyleOptionGraphicsItem)
+from PyQt5.QtGui import QBrush, QImage, qRgba
+from PyQt5.QtCore import Qt, QEvent, QRectF
+from controllers.imageToArray import load_maze
+from models.collisionMap import CollisionMap
+from models.particleFilter import ParticleFilter
+
+
+def maze_image(maze):
+    """One pixel per maze cell, walls black and open space transparent"""
+    maze = np.ascontiguousarray(maze, dtype=np.uint8)
+    rows, cols = maze.shape
+    image = QImage(maze.data, cols, rows, cols, QImage.Format_Indexed8)
+    image.setColorTable([qRgba(0, 0, 0, 0), qRgba(0, 0, 0, 255)])
+    return image.copy()  # own the pixels, the slice they came from may go
+
+
+class MazeTilesItem(QGraphicsItem):
+    """Draws a maze_pyramid from square tiles made when they first come into view.
+
+    Each paint picks the pyramid level whose cells are closest to one screen
+    pixel, so zoomed out it reads from the smaller copies, and draws only the
+    tiles of that level that overlap the exposed rect. Tile images are kept
+    in an LRU cache of `cache_size`, so memory stays bounded however large
+    the plan is and however much of it has been looked at.
+    """
+    def __init__(self, pyramid, cell_size=1, tile_cells=256, cache_size=256):
+        super().__init__()
+        self.pyramid = pyramid
+        self.cell_size = cell_size
+        self.tile_cells = tile_cells
+        self.cache_size = cache_size
+        self.tiles = OrderedDict()
+        rows, cols = pyramid[0].shape
+        self.rect = QRectF(0, 0, cols * cell_size, rows * cell_size)
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption)
+
+    def boundingRect(self):
+        return self.rect
+
+    def level_for(self, scale):
+        """The pyramid level to draw at `scale` screen pixels per scene unit"""
+        pixels = scale * self.cell_size  # per level 0 cell
+        if pixels >= 1:
+            return 0
+        return min(int(math.log2(1 / pixels)), len(self.pyramid) - 1)
+
+    def tile(self, level, row, col):
+        key = (level, row, col)
+        image = self.tiles.get(key)
+        if image is None:
+            n = self.tile_cells
+            image = self.tiles[key] = maze_image(self.pyramid[level][row * n:(row + 1) * n, col * n:(col + 1) * n])
+            if len(self.tiles) > self.cache_size:
+                self.tiles.popitem(last=False)
+        else:
+            self.tiles.move_to_end(key)
+        return image
+
+    def paint(self, painter, option, widget=None):
+        level = self.level_for(QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform()))
+        rows, cols = self.pyramid[level].shape
+        cell = self.cell_size * 2 ** level  # scene units per cell of this level
+        span = self.tile_cells * cell
+
+        exposed = option.exposedRect.intersected(self.rect)
+        if exposed.isEmpty():
+            return
+        for row in range(int(exposed.top() // span), min(math.ceil(exposed.bottom() / span), math.ceil(rows / self.tile_cells))):
+            for col in range(int(exposed.left() // span), min(math.ceil(exposed.right() / span), math.ceil(cols / self.tile_cells))):
+                image = self.tile(level, row, col)
+                painter.drawImage(QRectF(col * span, row * span, image.width() * cell, image.height() * cell), image)
+
+
+class MapView(QGraphicsView):
+    """QGraphicsView zoomed with the wheel, towards the mouse, and panned by dragging"""
+    def __init__(self, min_scale=0.05, max_scale=32.0, parent=None):
+        super().__init__(parent)
+        self.min_scale = min_scale
+        self.max_scale = max_scale
+        self.setTransformationAnchor(QGraphicsView.AnchorUnderMouse)
+        self.setDragMode(QGraphicsView.ScrollHandDrag)
+
+    def zoom(self, factor):
+        scale = self.transform().m11()
+        factor = min(max(scale * factor, self.min_scale), self.max_scale) / scale
+        self.scale(factor, factor)
+
+    def wheelEvent(self, event):
+        # a proportional step per degree, so trackpads zoom smoothly
+        self.zoom(2 ** (event.angleDelta().y() / 480))
 
 class FloorPlan(QWidget):
     def __init__(self, floor_plan_path, width=None, height=None, blur_effect=100, 
@@ -13,7 +104,7 @@ class FloorPlan(QWidget):
         self.trail_size = trail_size
         
         self.layout = QVBoxLayout(self)
-        self.view = QGraphicsView()
+        self.view = MapView()
         self.view.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
         self.view.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
         self.layout.addWidget(self.view)
@@ -22,13 +113,15 @@ class FloorPlan(QWidget):
         self.scene = QGraphicsScene()
         self.view.setScene(self.scene)
 
-        # Store walls, players, and trail
-        self.walls = []
+        # Store the maze item, players, and trail
+        self.maze_item = None
         self.players = []
         self.trail = []
 
         # Generate and load the floor plan
-        self.floor_plan = floorplan_to_maze(floor_plan_path, width, height, blur_effect)
+        # Cached next to the image, with smaller copies for zooming out
+        self.maze_pyramid = load_maze(floor_plan_path, width, height, blur_effect)
+        self.floor_plan = self.maze_pyramid[0]
         self.load_floor_plan()
 
         # Install event filter to capture key events
@@ -37,27 +130,39 @@ class FloorPlan(QWidget):
         # Resize the view to fit the window
         self.view.setFixedSize(width, height)
         self.view.setAlignment(Qt.AlignLeft | Qt.AlignTop)
+        # Zooming out stops once the whole plan fits
+        plan = self.maze_item.boundingRect()
+        self.view.min_scale = min(width / plan.width(), height / plan.height(), 1.0)
         self.setLayout(self.layout)
 
     def load_floor_plan(self):
         """Load and draw the floor plan with walls and player starting position."""
         self.scene.clear()  # Clear existing items
-        self.walls = []
         self.players = []
         self.trail = []
 
-        for row in range(len(self.floor_plan)):
-            for col in range(len(self.floor_plan[row])):
-                x, y = col * self.tile_size, row * self.tile_size
-                if self.floor_plan[row][col] == 1:  # Wall
-                    wall = QGraphicsRectItem(x, y, self.tile_size, self.tile_size)
-                    wall.setBrush(QBrush(Qt.black))
-                    self.scene.addItem(wall)
-                    self.walls.append(wall)
-                else:  # Empty space
-                    if not self.players:  # Add player at first empty space
-                        self.add_player(x + self.tile_size // 2 - self.player_size // 2, 
-                                       y + self.tile_size // 2 - self.player_size // 2)
+        # The walls are drawn from tiles of the pyramid level that suits the
+        # zoom, made when they come into view, so the player and trail are
+        # the only items that change
+        self.maze_item = MazeTilesItem(self.maze_pyramid, self.tile_size)
+        self.scene.addItem(self.maze_item)
+        self.scene.setSceneRect(self.maze_item.boundingRect())
+        self.collisions = CollisionMap(self.floor_plan, self.tile_size)
+        self.tracker = ParticleFilter(self.floor_plan, self.tile_size)
+
+        empty = np.flatnonzero(self.floor_plan.ravel() != 1)
+        if empty.size:  # Add player at first empty space
+            row, col = divmod(int(empty[0]), self.floor_plan.shape[1])
+            x, y = col * self.tile_size, row * self.tile_size
+            self.add_player(x + self.tile_size // 2 - self.player_size // 2, 
+                           y + self.tile_size // 2 - self.player_size // 2)
+            self.tracker.reset(*self.player_centre())
+
+    def hits_wall(self, rect):
+        """Whether any wall tile overlaps the scene rect"""
+        # Tiles count half a pixel bigger, as the outlined wall items used to
+        rect = rect.adjusted(-0.5, -0.5, 0.5, 0.5)
+        return self.collisions.hits_rect(rect.left(), rect.top(), rect.right(), rect.bottom())
 
     def add_player(self, x, y):
         """Add a player at the specified coordinates."""
@@ -66,6 +171,41 @@ class FloorPlan(QWidget):
         self.scene.addItem(player)
         self.players.append(player)
 
+    def player_centre(self):
+        rect = self.players[0].sceneBoundingRect()
+        return rect.center().x(), rect.center().y()
+
+    def move_player(self, x, y):
+        """Move the player's top left corner to (x, y), leaving a trail dot behind"""
+        player = self.players[0]
+        trail_dot = QGraphicsEllipseItem(player.x(), player.y(), 
+                                       self.player_size, self.player_size)
+        trail_dot.setBrush(QBrush(Qt.blue))
+        self.scene.addItem(trail_dot)
+        self.trail.append(trail_dot)
+
+        # Remove old trail if it exceeds the limit
+        if len(self.trail) > self.trail_size:
+            old_trail_dot = self.trail.pop(0)
+            self.scene.removeItem(old_trail_dot)
+
+        player.setX(x)
+        player.setY(y)
+
+    def track_step(self, length, heading):
+        """Move the player by a dead-reckoned step, kept inside the floor plan
+        by the particle filter. length is in scene units, heading in degrees."""
+        if not self.players:
+            return
+        self.tracker.step(length, heading)
+        position = self.collisions.snap(*self.tracker.mean())
+        if position is None:
+            return
+        # the ellipse is drawn at (player.x(), player.y()) plus its own rect
+        rect = self.players[0].rect()
+        self.move_player(position[0] - rect.x() - self.player_size / 2,
+                         position[1] - rect.y() - self.player_size / 2)
+
     def eventFilter(self, source, event):
         """Event filter to capture key press events."""
         if event.type() == QEvent.KeyPress and source is self.view:
@@ -97,25 +237,12 @@ class FloorPlan(QWidget):
         new_y = player.y() + dy
 
         # Boundary check
-        if (new_x < 0 or new_x + self.player_size > self.view.width() or 
-            new_y < 0 or new_y + self.player_size > self.view.height()):
+        player_rect = player.sceneBoundingRect().translated(dx, dy)
+        if not self.maze_item.boundingRect().contains(player_rect.center()):
             return
 
         # Collision check
-        player_rect = player.sceneBoundingRect().translated(dx, dy)
-        if not any(wall.sceneBoundingRect().intersects(player_rect) for wall in self.walls):
-            # Add current position to trail
-            trail_dot = QGraphicsEllipseItem(player.x(), player.y(), 
-                                           self.player_size, self.player_size)
-            trail_dot.setBrush(QBrush(Qt.blue))
-            self.scene.addItem(trail_dot)
-            self.trail.append(trail_dot)
-
-            # Remove old trail if it exceeds the limit
-            if len(self.trail) > self.trail_size:
-                old_trail_dot = self.trail.pop(0)
-                self.scene.removeItem(old_trail_dot)
-
-            # Move player
-            player.setX(new_x)
-            player.setY(new_y)
\ No newline at end of file
+        if not self.hits_wall(player_rect):
+            self.move_player(new_x, new_y)
+            # A position set by hand is known, so tracking restarts from it
+            self.tracker.reset(*self.player_centre())
\ No newline at end of file
@@ -1,9 +1,14 @@
+import os
+import sys
 import numpy as np
 import pandas as pd
 import time
 from collections import deque
 import matplotlib.pyplot as plt
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from models.zupt import ZuptDetector
+
 # === Load CSV Data ===
 filename = 'Walk_test_a2.csv'
 data = pd.read_csv(filename)
@@ -23,7 +28,7 @@ threshold = 0.6          # ZUPT Mahalanobis threshold
 
 # === Buffers ===
 acc_buffer = deque(maxlen=smooth_size)
-signal_window = deque(maxlen=window_size)
+detector = ZuptDetector(window_size, threshold)  # keeps its own window
 velocity_zupt = [0]
 position_zupt = [0]
 
@@ -92,11 +97,7 @@ for i in range(len(acc_data)):
     acc_smooth = np.mean(acc_buffer)
 
     # === ZUPT Detection ===
-    signal_window.append(acc_smooth)
-    mu = np.mean(signal_window)
-    sigma = np.var(signal_window)
-    mahal_dist = (acc_smooth - mu) / np.sqrt(sigma) if sigma > 0 else 0
-    zupt = abs(mahal_dist) < threshold
+    zupt = bool(detector.update([acc_smooth])[0])
     zupt_flags.append(zupt)
     
     # ZUPT-based velocity: zero acceleration if ZUPT
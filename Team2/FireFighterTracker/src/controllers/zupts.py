@@ -1,9 +1,14 @@
+import os
+import sys
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 from scipy.integrate import cumulative_trapezoid as cumtrapz
 from scipy.ndimage import uniform_filter1d
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from models.zupt import detect
+
 # === Load CSV File ===
 filename = 'Walk_test_a2.csv'  # Replace with your actual filename
 data = pd.read_csv(filename)
@@ -25,15 +30,7 @@ acc_signal = uniform_filter1d(acc_signal, size=5)  # Smooth signal
 
 # === ZUPT Detection (Mahalanobis Distance) ===
 window_size = 80
-zupt = np.zeros_like(acc_signal, dtype=bool)
-
-for i in range(window_size, len(acc_signal)):
-    window_data = acc_signal[i - window_size:i]
-    mu = np.mean(window_data)
-    sigma = np.var(window_data)
-    mahal_dist = (acc_signal[i] - mu) / np.sqrt(sigma) if sigma > 0 else 0
-    if abs(mahal_dist) < 0.6:
-        zupt[i] = True
+zupt = detect(acc_signal, window_size, threshold=0.6)
 
 # === Integrate to Get Velocity and Position ===
 velocity = cumtrapz(acc_signal, t, initial=0)
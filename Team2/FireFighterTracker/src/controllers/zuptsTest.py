@@ -1,8 +1,13 @@
+import os
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy.integrate import cumulative_trapezoid as cumtrapz
 from scipy.ndimage import uniform_filter1d
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from models.zupt import detect
+
 # === Simulation Parameters ===
 fs = 100  # Hz
 dt = 1 / fs
@@ -26,18 +31,7 @@ acc_signal = uniform_filter1d(acc_signal, size=5)  # smooth noise
 
 # === ZUPT Detection using Mahalanobis distance ===
 window_size = 80
-zupt = np.zeros_like(acc_signal, dtype=bool)
-
-for i in range(window_size, len(acc_signal)):
-    window_data = acc_signal[i - window_size:i]
-    mu = np.mean(window_data)
-    sigma = np.var(window_data)
-    if sigma > 0:
-        mahal_dist = (acc_signal[i] - mu) / np.sqrt(sigma)
-    else:
-        mahal_dist = 0
-    if abs(mahal_dist) < 0.6:
-        zupt[i] = True
+zupt = detect(acc_signal, window_size, threshold=0.6)
 
 # === Integration ===
 velocity = cumtrapz(acc_signal, t, initial=0)
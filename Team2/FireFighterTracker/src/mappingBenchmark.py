@@ -0,0 +1,188 @@
+"""Headless benchmark of the wall mapping pipeline on simulated rooms.
+
+    python mappingBenchmark.py
+    python mappingBenchmark.py --sizes 4 6 8 --steps 1000 4000 16000 --json before.json
+
+Rooms come from Team4's PentagonalRoomSimulator (extra_tools/sim.py). Each
+reading is projected from the simulator's true position the same way the
+mapping pages project radar points (distance / 2 pixels per cm), then fed
+through PointCloud and WallMap. Dead reckoning is left out so the accuracy
+figures are about the mapping alone.
+
+For every room size and packet count it prints per-packet latency
+percentiles, peak memory of the mapping models (tracemalloc, on a second
+untimed run), the number of wall lines and how well they match the real
+walls: the length weighted distance of the fitted lines from the nearest
+wall, and the fraction of the real walls with a fitted line within the
+tolerance. Latency is wall time by default; --clock cpu times the thread's
+CPU time instead, which is steadier on a busy or shared machine.
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "Team4", "extra_tools"))
+from models.pointCloud import PointCloud
+from models.wallModel import WallMap
+
+CLOCKS = {"wall": time.perf_counter_ns, "cpu": time.thread_time_ns}
+
+PIXELS_PER_METRE = 50  # the pages draw distance / 2 pixels per cm
+MAX_DISTANCE = 1000  # cm, readings past this are dropped like the pages do
+
+
+def simulate(room_size, steps, noise=0.2, seed=0):
+    """Radar points (n, 2) and true walls (5, 4) in pixels for one room"""
+    from sim import PentagonalRoomSimulator
+
+    np.random.seed(seed)
+    # the simulator makes a logs/ folder in the working directory, keep it out of the caller's
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as scratch:
+        os.chdir(scratch)
+        try:
+            sim = PentagonalRoomSimulator(room_size=room_size, circle_radius=0.3 * room_size,
+                                          num_steps=steps, noise_level=noise)
+        finally:
+            os.chdir(cwd)
+
+    points = []
+    for (px, py), reading in zip(sim.positions, sim.sensor_readings):
+        distance = reading["distance"]
+        if not 0 < distance < MAX_DISTANCE:
+            continue
+        d = distance / 2 * math.cos(math.radians(reading["pitch"]))
+        yaw = math.radians(reading["yaw"])
+        points.append((px * PIXELS_PER_METRE + d * math.cos(yaw), py * PIXELS_PER_METRE + d * math.sin(yaw)))
+
+    vertices = np.array(sim.room_vertices) * PIXELS_PER_METRE
+    walls = np.hstack([vertices, np.roll(vertices, -1, axis=0)])
+    return np.array(points).reshape(-1, 2), walls
+
+
+def run_mapping(points, timed=True, clock=time.perf_counter_ns):
+    """Feed the points through the models, returns them and per-point ns"""
+    cloud = PointCloud()
+    wall_map = WallMap()
+    latencies = np.zeros(len(points), dtype=np.int64)
+
+    for i, (x, y) in enumerate(points.tolist()):
+        start = clock()
+        cloud.add(x, y)
+        wall_map.add_point(x, y)
+        if timed:
+            latencies[i] = clock() - start
+
+    return cloud, wall_map, latencies
+
+
+def segment_distances(points, segments):
+    """(p,) distance from each point to the nearest of the (s, 4) segments"""
+    if len(segments) == 0:
+        return np.full(len(points), np.inf)
+    a = segments[None, :, :2]
+    ab = segments[None, :, 2:] - a
+    ap = points[:, None, :] - a
+    length2 = np.maximum(np.sum(ab * ab, axis=2), 1e-12)
+    t = np.clip(np.sum(ap * ab, axis=2) / length2, 0, 1)
+    nearest = a + t[..., None] * ab
+    return np.min(np.hypot(*(points[:, None, :] - nearest).transpose(2, 0, 1)), axis=1)
+
+
+def sample_segments(segments, step):
+    """Points every `step` pixels along each segment, with their weights"""
+    samples, weights = [], []
+    for x0, y0, x1, y1 in segments:
+        length = math.hypot(x1 - x0, y1 - y0)
+        n = max(int(length / step), 1)
+        t = (np.arange(n) + 0.5) / n
+        samples.append(np.column_stack([x0 + t * (x1 - x0), y0 + t * (y1 - y0)]))
+        weights.append(np.full(n, length / n))
+    if not samples:
+        return np.zeros((0, 2)), np.zeros(0)
+    return np.vstack(samples), np.concatenate(weights)
+
+
+def accuracy(wall_map, walls, tolerance):
+    """Fitted line error and wall coverage, in pixels"""
+    lines = np.array([[*line.end_points[0], *line.end_points[1]]
+                      for line in wall_map.lines if line.n >= 2]).reshape(-1, 4)
+
+    samples, weights = sample_segments(lines, step=5)
+    error = segment_distances(samples, walls)
+    mean_error = float(np.average(error, weights=weights)) if len(error) else math.nan
+
+    samples, _ = sample_segments(walls, step=5)
+    coverage = float(np.mean(segment_distances(samples, lines) <= tolerance))
+    return len(lines), mean_error, coverage
+
+
+def benchmark(room_size, steps, noise=0.2, seed=0, tolerance_cm=25, clock="wall"):
+    points, walls = simulate(room_size, steps, noise, seed)
+
+    cloud, wall_map, latencies = run_mapping(points, clock=CLOCKS[clock])
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99]) / 1000 if len(points) else (math.nan,) * 3
+
+    tracemalloc.start()
+    run_mapping(points, timed=False)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    lines, error, coverage = accuracy(wall_map, walls, tolerance_cm / 2)
+    return {
+        "room_size": room_size,
+        "steps": steps,
+        "points": len(points),
+        "lines": lines,
+        "p50_us": p50,
+        "p90_us": p90,
+        "p99_us": p99,
+        "max_us": latencies.max() / 1000 if len(points) else math.nan,
+        "total_ms": latencies.sum() / 1e6,
+        "peak_kib": peak / 1024,
+        "error_cm": error * 2,
+        "coverage": coverage,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark wall mapping on simulated pentagonal rooms')
+    parser.add_argument('--sizes', type=float, nargs='+', default=[3, 5, 8],
+                        help='Room sizes, centre to corner in metres (default: 3 5 8)')
+    parser.add_argument('--steps', type=int, nargs='+', default=[500, 2000, 8000],
+                        help='Packets per lap of the room (default: 500 2000 8000)')
+    parser.add_argument('--noise', type=float, default=0.2, help='Simulator noise level (default: 0.2)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    parser.add_argument('--tolerance', type=float, default=25,
+                        help='Distance in cm a wall counts as mapped within (default: 25)')
+    parser.add_argument('--clock', choices=sorted(CLOCKS), default='wall',
+                        help='Time packets by wall time or thread CPU time (default: wall)')
+    parser.add_argument('--json', help='Also write the results to this file')
+    args = parser.parse_args()
+
+    print(f"{'size m':>6} {'steps':>6} {'points':>6} {'lines':>5} {'p50 us':>7} {'p90 us':>7} "
+          f"{'p99 us':>7} {'max us':>8} {'peak KiB':>8} {'error cm':>8} {'covered':>7}")
+    results = []
+    for room_size in args.sizes:
+        for steps in args.steps:
+            r = benchmark(room_size, steps, args.noise, args.seed, args.tolerance, args.clock)
+            results.append(r)
+            print(f"{r['room_size']:6g} {r['steps']:6d} {r['points']:6d} {r['lines']:5d} {r['p50_us']:7.1f} "
+                  f"{r['p90_us']:7.1f} {r['p99_us']:7.1f} {r['max_us']:8.1f} {r['peak_kib']:8.0f} "
+                  f"{r['error_cm']:8.1f} {r['coverage']:7.1%}", flush=True)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
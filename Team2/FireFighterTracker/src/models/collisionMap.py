@@ -0,0 +1,81 @@
+import math
+
+import cv2
+import numpy as np
+
+
+class CollisionMap:
+    """Wall queries on a maze array (1 = wall) drawn at tile_size per cell.
+
+    An integral image answers "is there a wall in this rectangle" in four
+    lookups whatever the rectangle's size, and a Euclidean distance
+    transform gives every cell's distance to the nearest wall, which
+    clearance() and snap() use to keep tracked positions in free space.
+    Coordinates are scene units, cell (row, col) covering
+    [col * tile_size, (col + 1) * tile_size) and likewise for rows.
+    """
+    def __init__(self, maze, tile_size=1):
+        self.maze = np.asarray(maze, dtype=np.uint8)
+        self.tile_size = tile_size
+        self.rows, self.cols = self.maze.shape
+
+        self.integral = cv2.integral(self.maze)  # (rows + 1, cols + 1) running sums
+
+        # distance from each cell centre to the nearest wall cell centre, in cells
+        if self.maze.any():
+            self.distance = cv2.distanceTransform((self.maze == 0).astype(np.uint8), cv2.DIST_L2,
+                                                  cv2.DIST_MASK_PRECISE)
+        else:
+            self.distance = np.full(self.maze.shape, np.inf, dtype=np.float32)
+        self.free_cells = {}
+
+    def walls_in(self, r0, c0, r1, c1):
+        """Number of wall cells in rows r0:r1 and columns c0:c1, clipped to the maze"""
+        r0, r1 = max(r0, 0), min(r1, self.rows)
+        c0, c1 = max(c0, 0), min(c1, self.cols)
+        if r0 >= r1 or c0 >= c1:
+            return 0
+        s = self.integral
+        return int(s[r1, c1] - s[r0, c1] - s[r1, c0] + s[r0, c0])
+
+    def hits_rect(self, left, top, right, bottom):
+        """Whether a wall cell overlaps the rectangle, cells only touching its edge don't count"""
+        t = self.tile_size
+        return self.walls_in(math.floor(top / t), math.floor(left / t),
+                             math.ceil(bottom / t), math.ceil(right / t)) > 0
+
+    def cell(self, x, y):
+        """The maze cell under a scene point, clamped to the maze"""
+        row = min(max(math.floor(y / self.tile_size), 0), self.rows - 1)
+        col = min(max(math.floor(x / self.tile_size), 0), self.cols - 1)
+        return row, col
+
+    def clearance(self, x, y):
+        """Distance from the point's cell to the nearest wall cell, in scene units"""
+        return float(self.distance[self.cell(x, y)]) * self.tile_size
+
+    def snap(self, x, y, clearance=0.0):
+        """The point itself if its clearance is more than `clearance`, otherwise the
+        centre of the nearest cell that has (to within a fraction of a cell).
+        None if no cell has that much room."""
+        if self.clearance(x, y) > clearance:
+            return x, y
+
+        cells, nearest = self.free_cells_for(clearance)
+        if nearest is None:
+            return None
+        row, col = cells[nearest[self.cell(x, y)] - 1]
+        return (col + 0.5) * self.tile_size, (row + 0.5) * self.tile_size
+
+    def free_cells_for(self, clearance):
+        """Cells with more than `clearance`, and for every cell the (1-based) index of the nearest"""
+        if clearance not in self.free_cells:
+            blocked = (self.distance * self.tile_size <= clearance).astype(np.uint8)
+            cells = np.argwhere(blocked == 0)
+            nearest = None
+            if len(cells):
+                # labels number the free cells in row-major order, like argwhere
+                _, nearest = cv2.distanceTransformWithLabels(blocked, cv2.DIST_L2, cv2.DIST_MASK_PRECISE,
+                                                             labelType=cv2.DIST_LABEL_PIXEL)
+            self.free_cells[clearance] = cells, nearest
+        return self.free_cells[clearance]
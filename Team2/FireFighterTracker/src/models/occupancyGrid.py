@@ -0,0 +1,114 @@
+import math
+
+import numpy as np
+
+
+class OccupancyGrid:
+    """Log-odds occupancy grid built from radar returns.
+
+    Each return marks the cells on the ray from the sensor to the hit as more
+    likely free and the hit cell as more likely occupied. Cells are stored in
+    square tiles of `tile_size` cells, created the first time a ray reaches
+    them, so the map grows with the area seen rather than with a preset
+    size. The work per return is one ray of at most `max_range` pixels, no
+    matter how much has already been mapped.
+
+    Tiles changed since the last take_dirty() are kept in `dirty` for views
+    that only redraw what changed.
+    """
+    def __init__(self, cell_size=5.0, tile_size=64, max_range=500.0,
+                 l_occupied=0.85, l_free=-0.4, l_min=-4.0, l_max=4.0):
+        self.cell_size = cell_size
+        self.tile_size = tile_size
+        self.max_range = max_range
+        self.l_occupied = l_occupied
+        self.l_free = l_free
+        self.l_min = l_min
+        self.l_max = l_max
+        self.tiles = {}
+        self.dirty = set()
+
+    def __len__(self):
+        return len(self.tiles)
+
+    def cell(self, x, y):
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def tile(self, key):
+        tile = self.tiles.get(key)
+        if tile is None:
+            tile = self.tiles[key] = np.zeros((self.tile_size, self.tile_size), dtype=np.float32)
+        return tile
+
+    def ray_cells(self, x0, y0, x1, y1):
+        """Cells from (x0, y0) to (x1, y1) inclusive, one per step along the major axis"""
+        cx0, cy0 = self.cell(x0, y0)
+        cx1, cy1 = self.cell(x1, y1)
+        dx, dy = cx1 - cx0, cy1 - cy0
+        n = max(abs(dx), abs(dy))
+        if n == 0:
+            return np.array([cx0]), np.array([cy0])
+        steps = np.arange(n + 1) / n
+        return cx0 + np.rint(steps * dx).astype(np.int64), cy0 + np.rint(steps * dy).astype(np.int64)
+
+    def add_return(self, x0, y0, x1, y1, hit=True):
+        """Update for a return seen from (x0, y0) at (x1, y1)
+
+        Returns further than max_range are shortened to it and, with
+        hit=False, only clear the cells they pass through.
+        """
+        length = math.hypot(x1 - x0, y1 - y0)
+        if length > self.max_range:
+            scale = self.max_range / length
+            x1, y1 = x0 + (x1 - x0) * scale, y0 + (y1 - y0) * scale
+            hit = False
+
+        cx, cy = self.ray_cells(x0, y0, x1, y1)
+        size = self.tile_size
+        tx, ty = cx // size, cy // size
+        index = (cy - ty * size) * size + (cx - tx * size)
+
+        # all but the hit cell get more likely free. A straight ray never
+        # comes back to a tile, so each run of equal tile keys is all of that
+        # tile's cells.
+        free = len(cx) - 1 if hit else len(cx)
+        bounds = np.flatnonzero((tx[1:free] != tx[:free - 1]) | (ty[1:free] != ty[:free - 1])) + 1
+        bounds = [0, *bounds.tolist(), free]
+        for start, end in zip(bounds, bounds[1:]):
+            if start == end:
+                continue
+            key = (int(tx[start]), int(ty[start]))
+            cells = self.tile(key).reshape(-1)
+            run = index[start:end]
+            cells[run] = np.maximum(cells[run] + self.l_free, self.l_min)
+            self.dirty.add(key)
+
+        if hit:
+            key = (int(tx[-1]), int(ty[-1]))
+            cells = self.tile(key).reshape(-1)
+            i = index[-1]
+            cells[i] = min(cells[i] + self.l_occupied, self.l_max)
+            self.dirty.add(key)
+
+    def log_odds(self, x, y):
+        cx, cy = self.cell(x, y)
+        size = self.tile_size
+        tile = self.tiles.get((cx // size, cy // size))
+        return 0.0 if tile is None else float(tile[cy % size, cx % size])
+
+    def probability(self, x, y):
+        return 1 / (1 + math.exp(-self.log_odds(x, y)))
+
+    def tile_rect(self, key):
+        """(x, y, width, height) of a tile in map coordinates"""
+        side = self.tile_size * self.cell_size
+        return key[0] * side, key[1] * side, side, side
+
+    def take_dirty(self):
+        """Keys of the tiles changed since the last call"""
+        dirty, self.dirty = self.dirty, set()
+        return dirty
+
+    def clear(self):
+        self.tiles.clear()
+        self.dirty.clear()
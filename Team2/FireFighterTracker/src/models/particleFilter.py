@@ -0,0 +1,107 @@
+import math
+
+import numpy as np
+
+
+class ParticleFilter:
+    """Keeps a dead-reckoned position inside the open space of a floor plan.
+
+    Every particle is a guess at the position. Each step moves all of them
+    by the measured step length and heading plus some noise, and particles
+    whose move crosses a wall cell of the maze (1 = wall, tile_size scene
+    units per cell) or leaves the plan are dropped. The weighted mean of the
+    survivors is the estimate, so drift that would walk through a wall is
+    pulled back along the corridor the person must be in.
+
+    Particles are resampled systematically when too few carry the weight.
+    The work per step is `count` particles times at most `max_samples`
+    points along each move, all as array operations, so the cost of an
+    update is fixed whatever the plan or the path so far.
+
+    That cap is also the limit of the wall check: moves up to max_step()
+    ((max_samples - 1) / 2 cells, 7.5 by default) are checked every half
+    cell, longer ones at wider spacing, and can jump a wall thinner than
+    the spacing. floorplan_to_maze can leave walls one cell thick after
+    resizing, so raise max_samples if steps can be longer than that.
+    """
+    def __init__(self, maze, tile_size=1, count=2000, step_noise=0.15, heading_noise=10.0,
+                 max_samples=16, seed=None):
+        self.maze = np.asarray(maze, dtype=bool)
+        self.tile_size = tile_size
+        self.rows, self.cols = self.maze.shape
+        self.count = count
+        self.step_noise = step_noise  # fraction of the step length
+        self.heading_noise = heading_noise  # degrees
+        self.max_samples = max_samples
+        self.rng = np.random.default_rng(seed)
+
+        self.particles = np.zeros((count, 2))
+        self.weights = np.full(count, 1 / count)
+        self.steps = 0
+        self.lost_steps = 0
+
+    def reset(self, x, y, spread=0.0):
+        """Start every particle at (x, y), scattered by `spread` scene units"""
+        self.particles = np.array([x, y], dtype=float) + self.rng.normal(0, spread, (self.count, 2))
+        self.weights = np.full(self.count, 1 / self.count)
+
+    def max_step(self):
+        """The longest move, in scene units, that blocked() checks every half cell"""
+        return (self.max_samples - 1) / 2 * self.tile_size
+
+    def blocked(self, start, end):
+        """(n,) whether the moves from start to end (n, 2) touch a wall or leave the plan
+
+        Each move is checked at evenly spaced points no more than half a cell
+        apart, up to max_samples of them.
+        """
+        longest = np.max(np.hypot(*(end - start).T), initial=0) / self.tile_size
+        samples = min(max(math.ceil(2 * longest), 1), self.max_samples - 1) + 1
+        t = np.linspace(0, 1, samples)[None, :, None]
+        points = start[:, None, :] + t * (end - start)[:, None, :]
+
+        cols = np.floor(points[..., 0] / self.tile_size).astype(np.int64)
+        rows = np.floor(points[..., 1] / self.tile_size).astype(np.int64)
+        outside = (rows < 0) | (rows >= self.rows) | (cols < 0) | (cols >= self.cols)
+        walls = self.maze[np.clip(rows, 0, self.rows - 1), np.clip(cols, 0, self.cols - 1)]
+        return np.any(walls | outside, axis=1)
+
+    def step(self, length, heading):
+        """Move by a step of `length` scene units towards `heading` degrees
+        (0 along +x, 90 along +y). Returns False if every particle hit a wall,
+        in which case the step is dropped and the particles stay put."""
+        n = self.count
+        lengths = length * (1 + self.rng.normal(0, self.step_noise, n))
+        headings = np.radians(heading + self.rng.normal(0, self.heading_noise, n))
+        moved = self.particles + np.column_stack([np.cos(headings), np.sin(headings)]) * lengths[:, None]
+
+        weights = np.where(self.blocked(self.particles, moved), 0.0, self.weights)
+        total = weights.sum()
+        self.steps += 1
+        if total == 0:
+            self.lost_steps += 1
+            self.weights = np.full(n, 1 / n)
+            return False
+
+        self.particles = moved
+        self.weights = weights / total
+        if self.effective_count() < n / 2:
+            self.resample()
+        return True
+
+    def effective_count(self):
+        return 1 / np.sum(self.weights ** 2)
+
+    def resample(self):
+        """Systematic resampling: one random offset, then n evenly spaced picks"""
+        n = self.count
+        positions = (self.rng.random() + np.arange(n)) / n
+        cumulative = np.cumsum(self.weights)
+        cumulative[-1] = 1.0
+        self.particles = self.particles[np.searchsorted(cumulative, positions)]
+        self.weights = np.full(n, 1 / n)
+
+    def mean(self):
+        """The weighted mean position (x, y)"""
+        x, y = self.weights @ self.particles
+        return float(x), float(y)
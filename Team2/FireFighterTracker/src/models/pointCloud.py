@@ -0,0 +1,56 @@
+import math
+
+import numpy as np
+
+
+class PointCloud:
+    """Radar points thinned to one per grid cell.
+
+    A point landing in a cell that already holds one is dropped, so a wall
+    scanned for an hour costs no more than one scanned once. The points live
+    in a fixed NumPy buffer; past `max_points` the oldest is overwritten.
+    `version` changes whenever the points do, for views that cache what they
+    draw.
+    """
+    def __init__(self, cell_size=5.0, max_points=50000):
+        self.cell_size = cell_size
+        self.max_points = max_points
+        self.points = np.zeros((max_points, 2))
+        self.slot_cells = [None] * max_points
+        self.cells = {}
+        self.count = 0
+        self.next_slot = 0
+        self.version = 0
+
+    def __len__(self):
+        return self.count
+
+    def add(self, x, y):
+        """Add a point, returns False if its cell already had one"""
+        cell = (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+        if cell in self.cells:
+            return False
+
+        slot = self.next_slot
+        evicted = self.slot_cells[slot]
+        if evicted is not None:
+            del self.cells[evicted]
+        self.cells[cell] = slot
+        self.slot_cells[slot] = cell
+        self.points[slot] = (x, y)
+
+        self.next_slot = (slot + 1) % self.max_points
+        self.count = min(self.count + 1, self.max_points)
+        self.version += 1
+        return True
+
+    def xy(self):
+        """(n, 2) view of the points, in no particular order"""
+        return self.points[:self.count]
+
+    def clear(self):
+        self.slot_cells = [None] * self.max_points
+        self.cells.clear()
+        self.count = 0
+        self.next_slot = 0
+        self.version += 1
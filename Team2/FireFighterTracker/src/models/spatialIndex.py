@@ -0,0 +1,89 @@
+import math
+
+
+class SegmentGrid:
+    """Uniform grid over segment bounding boxes.
+
+    Each item is stored in every cell its bounding box (grown by `padding`)
+    touches, so "which items could be near this point" and "which items could
+    be near this item" only look at a few cells instead of every item. Results
+    are candidates; callers still do their exact distance check.
+    """
+
+    def __init__(self, cell_size, padding=0.0, max_cells=4096):
+        self.cell_size = cell_size
+        self.padding = padding
+        self.max_cells = max_cells
+        self.cells = {}
+        # item -> (cx0, cy0, cx1, cy1) cell range, or None if oversized
+        self.ranges = {}
+        self.item_cells = {}
+        # items whose box is too big to grid (e.g. a fit that ran away) are
+        # always returned as candidates
+        self.oversized = set()
+
+    def __len__(self):
+        return len(self.ranges)
+
+    def __contains__(self, item):
+        return item in self.ranges
+
+    def cell(self, x, y):
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    def cell_range(self, bbox):
+        x0, y0, x1, y1 = bbox
+        if not all(math.isfinite(v) for v in bbox):
+            return None
+        cx0, cy0 = self.cell(x0 - self.padding, y0 - self.padding)
+        cx1, cy1 = self.cell(x1 + self.padding, y1 + self.padding)
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > self.max_cells:
+            return None
+        return (cx0, cy0, cx1, cy1)
+
+    def cells_in(self, cell_range):
+        cx0, cy0, cx1, cy1 = cell_range
+        return [(cx, cy) for cx in range(cx0, cx1 + 1) for cy in range(cy0, cy1 + 1)]
+
+    def update(self, item, bbox):
+        """Insert `item`, or move it if its bounding box changed."""
+        new = self.cell_range(bbox)
+        if item in self.ranges and self.ranges[item] == new:
+            return
+        self.remove(item)
+        self.ranges[item] = new
+        if new is None:
+            self.oversized.add(item)
+            return
+        cells = self.item_cells[item] = self.cells_in(new)
+        for c in cells:
+            self.cells.setdefault(c, set()).add(item)
+
+    def remove(self, item):
+        self.ranges.pop(item, None)
+        self.oversized.discard(item)
+        for c in self.item_cells.pop(item, ()):
+            bucket = self.cells[c]
+            bucket.discard(item)
+            if not bucket:
+                del self.cells[c]
+
+    def clear(self):
+        self.cells.clear()
+        self.ranges.clear()
+        self.item_cells.clear()
+        self.oversized.clear()
+
+    def near_point(self, x, y):
+        """Items whose padded bounding box may contain (x, y)."""
+        return self.cells.get(self.cell(x, y), set()) | self.oversized
+
+    def near_item(self, item):
+        """Items whose padded bounding box may overlap `item`'s."""
+        if item in self.oversized:
+            return set(self.ranges) - {item}
+        found = set(self.oversized)
+        for c in self.item_cells.get(item, ()):
+            found |= self.cells[c]
+        found.discard(item)
+        return found
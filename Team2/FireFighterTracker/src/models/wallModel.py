@@ -0,0 +1,352 @@
+import heapq
+import itertools
+import math
+
+from models.spatialIndex import SegmentGrid
+
+# Wall lines fitted to radar points. Nothing in here touches Qt, the views
+# draw a WallMap with views/wallRenderer.py.
+
+def angle_between(a, b):
+    """Difference between two line directions, ignoring which way they point"""
+    return abs((a - b + math.pi / 2) % math.pi - math.pi / 2)
+
+
+class LineMoments:
+    """Running mean and centred second moments of a set of points.
+
+    Updated one point at a time (Welford) or merged with another set (Chan et
+    al.), both O(1). Centred sums keep their precision far from the origin,
+    unlike raw Sxx/Sxy sums.
+    """
+    def __init__(self, n=0, mx=0.0, my=0.0, sxx=0.0, syy=0.0, sxy=0.0):
+        self.n, self.mx, self.my = n, mx, my
+        self.sxx, self.syy, self.sxy = sxx, syy, sxy
+
+    def plus_point(self, x, y):
+        n = self.n + 1
+        dx, dy = x - self.mx, y - self.my
+        mx, my = self.mx + dx / n, self.my + dy / n
+        return LineMoments(n, mx, my, self.sxx + dx * (x - mx), self.syy + dy * (y - my), self.sxy + dx * (y - my))
+
+    def plus(self, other):
+        if self.n == 0: return other
+        if other.n == 0: return self
+        n = self.n + other.n
+        dx, dy = other.mx - self.mx, other.my - self.my
+        w = self.n * other.n / n
+        return LineMoments(n, self.mx + dx * other.n / n, self.my + dy * other.n / n,
+                           self.sxx + other.sxx + dx * dx * w,
+                           self.syy + other.syy + dy * dy * w,
+                           self.sxy + other.sxy + dx * dy * w)
+
+    def angle(self):
+        """Direction of the total least squares line, in (-pi/2, pi/2]"""
+        return 0.5 * math.atan2(2 * self.sxy, self.sxx - self.syy)
+
+    def spread(self):
+        """Scatter along and across the line (eigenvalues of the scatter matrix)"""
+        mid = (self.sxx + self.syy) / 2
+        half = math.hypot((self.sxx - self.syy) / 2, self.sxy)
+        return mid + half, max(mid - half, 0.0)
+
+    def residual(self):
+        """RMS distance of the points from the line"""
+        if self.n < 3:
+            return 0.0
+        return math.sqrt(self.spread()[1] / (self.n - 2))
+
+    def angle_error(self):
+        """Standard error of angle(), pi/2 while there's too little to tell"""
+        along, across = self.spread()
+        if self.n < 3 or along <= 0:
+            return math.pi / 2
+        return math.atan2(self.residual(), math.sqrt(along))
+
+
+class WallLine:
+    """A wall segment fitted by orthogonal regression.
+
+    The line is kept in Hesse normal form, x*cos(phi) + y*sin(phi) = rho,
+    through the centroid of its points, so vertical and horizontal walls are
+    handled the same as any other. The segment runs between two end points on
+    the line, which only move outwards as points are added.
+    """
+    def __init__(self,start_point_x,start_point_y,line_radius=50):
+        self.moments = LineMoments()
+        self.angle = 0.0
+        # unit direction, unit normal (cos(phi), sin(phi)) and rho, kept in
+        # step with angle by fit()
+        self.direction = (1.0, 0.0)
+        self.normal = (0.0, 1.0)
+        self.rho = 0.0
+        self.end_points = [(start_point_x,start_point_y),(start_point_x,start_point_y)]
+        self.line_radius = line_radius
+        self.initial_x = start_point_x
+        self.initial_y = start_point_y
+        # points further off the line than this (or 3x the scatter of the
+        # points so far, if larger) are left out rather than bending the fit
+        self.noise_floor = line_radius / 5
+        self.angle_tolerance = 1
+        self.starting_angle_tolerance = 90
+        self.angle_learning_rate = 1
+        self.number_of_points_for_established_trend = 10
+
+    @property
+    def n(self):
+        return self.moments.n
+
+    @property
+    def centre(self):
+        return (self.moments.mx, self.moments.my)
+
+    def tolerance(self, n):
+        """Largest change of direction accepted when merging into n points.
+
+        Never less than three standard errors of the fitted direction, so
+        two pieces of a noisy wall still merge.
+        """
+        base_threshold = math.radians(self.starting_angle_tolerance)
+        k = self.angle_learning_rate
+        schedule = max(math.radians(self.angle_tolerance), base_threshold * math.exp(-k * (n - 2)))
+        return max(schedule, 3 * self.moments.angle_error())
+
+    def add_point(self, x, y):
+        if self.n >= 2 and self.offset(x, y) > max(self.noise_floor, 3 * self.moments.residual()):
+            return False
+        self.fit(self.moments.plus_point(x, y))
+
+        if self.n == 1:
+            self.end_points = [(x, y), (x, y)]
+        else:
+            self.update_end_points(x, y, self.n > self.number_of_points_for_established_trend)
+        return True
+
+    def fit(self, moments):
+        self.moments = moments
+        if moments.n >= 2:
+            self.angle = moments.angle()
+        ux, uy = math.cos(self.angle), math.sin(self.angle)
+        self.direction = (ux, uy)
+        self.normal = (-uy, ux)
+        self.rho = -uy * moments.mx + ux * moments.my
+
+    def along(self, x, y):
+        """Position of (x, y) projected onto the line, from the centre"""
+        ux, uy = self.direction
+        return (x - self.moments.mx) * ux + (y - self.moments.my) * uy
+
+    def offset(self, x, y):
+        """Perpendicular distance of (x, y) from the line"""
+        nx, ny = self.normal
+        return abs(nx * x + ny * y - self.rho)
+
+    def point_at(self, t):
+        ux, uy = self.direction
+        return (self.moments.mx + t * ux, self.moments.my + t * uy)
+
+    def span(self):
+        t0, t1 = (self.along(*p) for p in self.end_points)
+        return min(t0, t1), max(t0, t1)
+
+    def reaches(self, x, y, slack=0.0):
+        """True if (x, y) projects onto the segment, give or take `slack`"""
+        t0, t1 = self.span()
+        return t0 - slack <= self.along(x, y) <= t1 + slack
+
+    def distance(self, x, y):
+        """Distance from (x, y) to the segment"""
+        if self.n < 2:
+            return math.hypot(x - self.initial_x, y - self.initial_y)
+        t0, t1 = self.span()
+        if t0 <= self.along(x, y) <= t1:
+            return self.offset(x, y)
+        return min(math.hypot(x - ex, y - ey) for ex, ey in self.end_points)
+
+    def bounding_box(self):
+        (x0, y0), (x1, y1) = self.end_points
+        if self.n < 2:
+            x0, x1 = min(x0, x1, self.initial_x), max(x0, x1, self.initial_x)
+            y0, y1 = min(y0, y1, self.initial_y), max(y0, y1, self.initial_y)
+        return (min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1))
+
+    def find_relevant_end_point(self,x,y):
+        distance = [math.hypot(x - ex, y - ey) for ex, ey in self.end_points]
+        return 0 if distance[0] < distance[1] else 1
+
+    def in_line_radius(self,x,y,multiplier=1):
+        return self.distance(x, y) < self.line_radius * multiplier
+
+    def update_end_points(self, x, y, established_trend=False):
+        """Put the end points back on the (refitted) line and stretch the
+        segment to cover (x, y) if it falls past an end"""
+        ts = [self.along(*p) for p in self.end_points]
+        t = self.along(x, y)
+        if not min(ts) <= t <= max(ts):
+            relevant_end_point = self.find_relevant_end_point(x, y)
+            # once the line has a trend, only stretch it for points roughly
+            # ahead of the end, not off to the side
+            beyond = abs(t - ts[relevant_end_point])
+            if not established_trend or math.atan2(self.offset(x, y), beyond) < math.radians(60):
+                ts[relevant_end_point] = t
+        self.end_points = [self.point_at(t) for t in ts]
+
+    def combine_lines(self,other):
+        self.fit(self.moments.plus(other.moments))
+        ts = [self.along(*p) for p in self.end_points + other.end_points]
+        self.end_points = [self.point_at(min(ts)), self.point_at(max(ts))]
+
+    def can_combine_lines(self,other):
+        moments = self.moments.plus(other.moments)
+        if moments.n < 2:
+            return True
+        angle = moments.angle()
+        tolerance = max(self.tolerance(moments.n), other.tolerance(moments.n))
+        return angle_between(self.angle, angle) <= tolerance and angle_between(other.angle, angle) <= tolerance
+
+    def intersection(self, other):
+        """Where the two (infinite) lines cross, or None if parallel"""
+        (a1, b1), (a2, b2) = self.normal, other.normal
+        det = a1 * b2 - a2 * b1
+        if abs(det) < 1e-9:
+            return None
+        r1, r2 = self.rho, other.rho
+        return ((r1 * b2 - r2 * b1) / det, (a1 * r2 - a2 * r1) / det)
+
+    # returns true if the "other" line is merged into the "self" line
+    def connect_lines(self, other):
+        closest_pair = min(((a, b) for a in self.end_points for b in other.end_points),
+                           key=lambda pair: math.hypot(pair[0][0] - pair[1][0], pair[0][1] - pair[1][1]))
+
+        if self.in_line_radius(closest_pair[1][0],closest_pair[1][1]):
+            if self.can_combine_lines(other):
+                self.combine_lines(other)
+                return True
+
+        if other.n<2 or self.n<2:
+            return False
+
+        # walls that nearly meet are stretched to the corner. Once a wall
+        # reaches it the corner isn't added again, so it isn't weighted by
+        # how often the pair gets checked.
+        intersection_point = self.intersection(other)
+        if intersection_point is None:
+            return False
+        if self.in_line_radius(*intersection_point,multiplier=2) and other.in_line_radius(*intersection_point,multiplier = 2) and other.n>5 and self.n>5:
+            for line in (self, other):
+                if not line.reaches(*intersection_point, slack=line.noise_floor / 2):
+                    line.add_point(*intersection_point)
+        return False
+
+
+class WallMap:
+    """Lines fitted to the radar points seen so far"""
+    def __init__(self, line_radius=50):
+        self.line_radius = line_radius
+        self.lines = []
+        # lines are indexed by their end point box grown by the widest radius
+        # connect_lines checks (2x), so point matching and merge candidates
+        # only look at nearby lines
+        self.index = SegmentGrid(cell_size=4 * line_radius, padding=2 * line_radius)
+        self.order = {}
+        self.counter = itertools.count()
+        self.dirty = set()
+        # what changed since the last take_changes(), for the renderer
+        self.changed = set()
+        self.removed = set()
+
+    def __len__(self):
+        return len(self.lines)
+
+    def add_point(self, x, y):
+        """Fit a radar point into the nearby lines, or start a new one"""
+        matched = False
+        for line in self.index.near_point(x, y):
+            if line.in_line_radius(x, y):
+                matched = True
+                line.add_point(x, y)
+                self.touch(line)
+
+        if not matched:
+            new_line = WallLine(start_point_x=x,start_point_y=y,line_radius=self.line_radius)
+            new_line.add_point(x, y)
+            self.lines.append(new_line)
+            self.order[new_line] = next(self.counter)
+            self.touch(new_line)
+
+        self.resolve()
+
+    def touch(self, line):
+        self.index.update(line, line.bounding_box())
+        self.dirty.add(line)
+        self.changed.add(line)
+
+    def resolve(self):
+        """Merge or join the lines near the ones the last point changed"""
+        # Only pairs with a changed line are checked, and only pairs the index
+        # returns, since the rest are too far apart for connect_lines to act
+        # on. Turns are taken in line order like a pass over every pair, and a
+        # line changed on the way (merged, or given a corner point) queues its
+        # later neighbours. Corners are only re-joined when one of their walls
+        # gets a point, rather than on every packet.
+        order = self.order
+        dirty = self.dirty
+        merged = set()
+        turns = []
+
+        def queue(line, after):
+            for other in [line, *self.index.near_item(line)]:
+                if order[other] > after:
+                    heapq.heappush(turns, (order[other], other))
+
+        for line in dirty:
+            queue(line, -1)
+
+        done = -1
+        while turns:
+            turn, line = heapq.heappop(turns)
+            if turn <= done or line in merged:
+                continue
+            done = cursor = turn
+            while True:
+                later = [other for other in self.index.near_item(line)
+                         if order[other] > cursor and (line in dirty or other in dirty)]
+                if not later:
+                    break
+                other = min(later, key=order.get)
+                cursor = order[other]
+
+                n_line, n_other = line.n, other.n
+                if line.connect_lines(other):
+                    merged.add(other)
+                    self.index.remove(other)
+                    touched = [line]
+                elif line.n != n_line or other.n != n_other:
+                    touched = [line, other]
+                else:
+                    continue
+                for t in touched:
+                    self.touch(t)
+                    queue(t, turn)
+
+        self.dirty = set()
+        if merged:
+            self.lines = [line for line in self.lines if line not in merged]
+            for line in merged:
+                del order[line]
+            self.removed |= merged
+            self.changed -= merged
+
+    def take_changes(self):
+        """Lines changed and lines removed since the last call"""
+        changed, removed = self.changed, self.removed
+        self.changed, self.removed = set(), set()
+        return changed, removed
+
+    def clear(self):
+        self.lines.clear()
+        self.index.clear()
+        self.order.clear()
+        self.dirty.clear()
+        self.changed.clear()
+        self.removed.clear()
@@ -0,0 +1,154 @@
+import numpy as np
+from scipy.integrate import cumulative_trapezoid as cumtrapz
+from scipy.ndimage import uniform_filter1d
+
+
+def rolling_stats(signal, window):
+    """Mean and variance of the `window` samples before each sample, NaN for the first `window`
+
+    Uses cumulative sums, so it is O(n) whatever the window. The signal is
+    centred first to keep the sums of squares from losing precision.
+    """
+    signal = np.asarray(signal, dtype=np.float64)
+    n = len(signal)
+    mean = np.full(n, np.nan)
+    var = np.full(n, np.nan)
+    if n <= window:
+        return mean, var
+
+    centred = signal - signal.mean()
+    s1 = np.concatenate([[0.0], np.cumsum(centred)])
+    s2 = np.concatenate([[0.0], np.cumsum(centred * centred)])
+    # sample i's window is i - window .. i - 1
+    m = (s1[window:n] - s1[:n - window]) / window
+    v = (s2[window:n] - s2[:n - window]) / window - m * m
+    mean[window:] = m + signal.mean()
+    # a constant window should give exactly 0, not rounding error
+    var[window:] = np.where(v > 1e-12 * np.maximum(s2[-1] / n, 1e-12), v, 0.0)
+    return mean, var
+
+
+def detect(signal, window_size=10, threshold=0.6):
+    """Zero velocity flags: samples within `threshold` standard deviations of
+    the mean of the `window_size` samples before them (Mahalanobis distance
+    in one dimension). A window with no variance counts as still. The first
+    `window_size` samples are never flagged."""
+    signal = np.asarray(signal, dtype=np.float64)
+    mean, var = rolling_stats(signal, window_size)
+    zupt = np.zeros(len(signal), dtype=bool)
+    if len(signal) <= window_size:
+        return zupt
+
+    s, mu, sigma2 = signal[window_size:], mean[window_size:], var[window_size:]
+    dist = np.zeros_like(s)
+    moving = sigma2 > 0
+    dist[moving] = (s[moving] - mu[moving]) / np.sqrt(sigma2[moving])
+    zupt[window_size:] = np.abs(dist) < threshold
+    return zupt
+
+
+def positions(accel, dt, window_size=10, threshold=0.6, smoothing=5):
+    """Position along one axis from acceleration samples `dt` apart, with the
+    velocity zeroed wherever detect() flags the smoothed signal"""
+    acc_signal = uniform_filter1d(np.asarray(accel, dtype=np.float64), size=smoothing)
+    zupt = detect(acc_signal, window_size, threshold)
+    velocity = cumtrapz(acc_signal, dx=dt, initial=0)
+    velocity[zupt] = 0
+    return cumtrapz(velocity, dx=dt, initial=0)
+
+
+class ZuptDetector:
+    """detect() for a signal that arrives a few samples at a time.
+
+    Only the last `window_size` samples are kept between updates, so each
+    update costs the same however long the signal has run, and the flags
+    are the ones detect() would give for the whole signal.
+    """
+    def __init__(self, window_size=10, threshold=0.6):
+        self.window_size = window_size
+        self.threshold = threshold
+        self.tail = np.zeros(0)
+
+    def update(self, samples):
+        """Flags for the new samples"""
+        samples = np.asarray(samples, dtype=np.float64).reshape(-1)
+        signal = np.concatenate([self.tail, samples])
+        # until there are window_size samples the tail is the whole signal,
+        # so its first samples go unflagged as they would in detect()
+        zupt = detect(signal, self.window_size, self.threshold)[len(self.tail):]
+        self.tail = signal[-self.window_size:]
+        return zupt
+
+
+class ZuptIntegrator:
+    """positions() for a signal that arrives a few samples at a time.
+
+    The centred smoothing needs smoothing // 2 samples after each one, so
+    positions come out that many samples behind the input until finish()
+    smooths the last ones against the end of the signal. Apart from that
+    delay they match positions() on the whole signal, for an odd
+    `smoothing`.
+    """
+    def __init__(self, dt, window_size=10, threshold=0.6, smoothing=5):
+        if smoothing % 2 == 0:
+            raise ValueError("smoothing must be odd")
+        self.dt = dt
+        self.smoothing = smoothing
+        self.detector = ZuptDetector(window_size, threshold)
+        self.pending = np.zeros(0)  # samples the next smoothed values still need
+        self.started = False
+        self.last = None  # (acceleration, integrated velocity, zeroed velocity, position)
+
+    def smooth(self, samples):
+        """Smoothed values of the samples that now have enough after them"""
+        half = self.smoothing // 2
+        if self.started:
+            padded = np.concatenate([self.pending, samples])
+        else:
+            signal = np.concatenate([self.pending, samples])
+            if len(signal) <= half:
+                self.pending = signal
+                return np.zeros(0)
+            # uniform_filter1d's default 'reflect' edge: x[1] x[0] | x[0] x[1] ...
+            padded = np.concatenate([signal[:half][::-1], signal])
+            self.started = True
+        self.pending = padded[len(padded) - 2 * half:]
+        return np.convolve(padded, np.full(self.smoothing, 1 / self.smoothing), mode="valid")
+
+    def update(self, samples):
+        """Positions of the samples that are now final"""
+        return self.integrate(self.smooth(np.asarray(samples, dtype=np.float64).reshape(-1)))
+
+    def finish(self):
+        """Positions of the samples still held back, the signal having ended"""
+        if self.started:
+            # the same 'reflect' edge at the end: ... x[-2] x[-1] | x[-1] x[-2]
+            half = self.smoothing // 2
+            padded = np.concatenate([self.pending, self.pending[len(self.pending) - half:][::-1]])
+            acc = np.convolve(padded, np.full(self.smoothing, 1 / self.smoothing), mode="valid")
+        else:
+            acc = uniform_filter1d(self.pending, size=self.smoothing) if len(self.pending) else self.pending
+        self.pending = np.zeros(0)
+        return self.integrate(acc)
+
+    def integrate(self, acc):
+        if not len(acc):
+            return acc
+        zupt = self.detector.update(acc)
+
+        first = []
+        if self.last is None:
+            # both integrals start at 0
+            first, self.last = [0.0], (acc[0], 0.0, 0.0, 0.0)
+            acc, zupt = acc[1:], zupt[1:]
+        a0, v0, z0, p0 = self.last
+
+        a = np.concatenate([[a0], acc])
+        velocity = v0 + np.cumsum((a[:-1] + a[1:]) * self.dt / 2)
+        zeroed = np.where(zupt, 0.0, velocity)
+        z = np.concatenate([[z0], zeroed])
+        position = p0 + np.cumsum((z[:-1] + z[1:]) * self.dt / 2)
+
+        if len(acc):
+            self.last = a[-1], velocity[-1], zeroed[-1], position[-1]
+        return np.concatenate([first, position])
@@ -0,0 +1,62 @@
+"""Replays a recorded capture into the mapping page, no hardware needed.
+
+    python replay.py logs/raw_data_20250301_141500.json             # real time
+    python replay.py logs/raw_data_20250301_141500.json --speed 8   # 8x
+    python replay.py logs/raw_data_20250301_141500.json --speed max --quit
+
+When every packet has been applied to the map the processed packets per
+second are printed, which makes --speed max --quit a repeatable throughput
+benchmark of the whole mapping pipeline.
+"""
+import argparse
+import os
+import sys
+import time
+
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QApplication, QStackedWidget
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+from controllers.connections import ReplayConnection
+from views.newMapping import NewMapping
+
+
+def parse_speed(text):
+    return None if text == "max" else float(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay a JSON lines capture into the mapping page')
+    parser.add_argument('capture', help='logs/raw_data_*.json from helper.py, or a sim.py simulated_data_*.json')
+    parser.add_argument('--speed', type=parse_speed, default=1.0,
+                        help='Playback speed multiplier, or "max" for as fast as possible (default: 1)')
+    parser.add_argument('--quit', action='store_true', help='Exit once every packet has been processed')
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    stack = QStackedWidget()
+    replay = ReplayConnection(args.capture, speed=args.speed)
+    page = NewMapping(stack, connection=replay)
+    stack.addWidget(page)
+    started = time.perf_counter()
+
+    def check_done():
+        if replay.status != "Finished" or page.scheduler.backlog:
+            return
+        done.stop()
+        seconds = time.perf_counter() - started
+        print(f"Processed {len(replay.packets)} packets in {seconds:.2f}s "
+              f"({len(replay.packets) / seconds:.0f} packets/s), {len(page.wall_map)} wall lines")
+        if args.quit:
+            app.quit()
+
+    done = QTimer()
+    done.timeout.connect(check_done)
+    done.start(100)
+
+    stack.show()
+    sys.exit(app.exec_())
+
+
+if __name__ == "__main__":
+    main()
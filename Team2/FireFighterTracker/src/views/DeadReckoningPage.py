@@ -4,13 +4,12 @@ from PyQt5.QtGui import QFont, QIcon
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 import matplotlib.pyplot as plt
 from widgets.titleWidget import TitleWidget
-
-from scipy.ndimage import uniform_filter1d
-from scipy.integrate import cumulative_trapezoid as cumtrapz
-import numpy as np
+from models import zupt
 
 
 class DeadReckoningPage(QWidget):
+    dt = 0.005  # seconds between IMU samples
+
     def __init__(self, stack, text="None"):
         super().__init__()
         self.stack = stack
@@ -112,6 +111,12 @@ class DeadReckoningPage(QWidget):
         self.x_accel_history = []
         self.y_accel_history = []
         self.time_history = []
+        # ZUPT positions are worked out as samples arrive rather than from
+        # the whole history on every tick
+        self.x_zupt = zupt.ZuptIntegrator(self.dt)
+        self.y_zupt = zupt.ZuptIntegrator(self.dt)
+        self.x_zupt_positions = []
+        self.y_zupt_positions = []
         self.current_index = 0
         self.timer.start(1)  # 100 Hz = 0.01s
 
@@ -119,9 +124,14 @@ class DeadReckoningPage(QWidget):
     def update_plot(self):
         if self.current_index >= len(self.imu_data):
             self.timer.stop()
+            # the last samples of the ZUPT track were waiting on ones after them
+            self.x_zupt_positions.extend(self.x_zupt.finish())
+            self.y_zupt_positions.extend(self.y_zupt.finish())
+            self.zupt_line.set_data(self.x_zupt_positions, self.y_zupt_positions)
+            self.canvas.draw()
             return
 
-        dt = 0.005 
+        dt = self.dt
 
         data = self.imu_data[self.current_index]
 
@@ -155,13 +165,14 @@ class DeadReckoningPage(QWidget):
         self.ax.grid(True)
         self.ax.legend()
 
-        # Compute ZUPT-based X and Y positions
-        x_zupt = self.compute_zupt_positions(self.x_accel_history, dt)
-        y_zupt = self.compute_zupt_positions(self.y_accel_history, dt)
+        # Compute ZUPT-based X and Y positions, two samples behind for the smoothing
+        self.x_zupt_positions.extend(self.x_zupt.update([ax]))
+        self.y_zupt_positions.extend(self.y_zupt.update([ay]))
+        x_zupt, y_zupt = self.x_zupt_positions, self.y_zupt_positions
 
         # Plot original and ZUPT-corrected
         self.ax.plot(x_vals, y_vals, marker='o', label="Dead Reckoning", color="blue")
-        self.ax.plot(x_zupt, y_zupt, linestyle='--', label="ZUPT Enhanced", color="red")
+        self.zupt_line, = self.ax.plot(x_zupt, y_zupt, linestyle='--', label="ZUPT Enhanced", color="red")
         self.ax.set_title("IMU Dead Reckoning Trajectory")
         self.ax.set_xlabel("X Position (mm)")
         self.ax.set_ylabel("Y Position (mm)")
@@ -210,25 +221,3 @@ class DeadReckoningPage(QWidget):
                 self.setStyleSheet(f.read())
         except FileNotFoundError:
             print("Log: Stylesheet not found. Using default styles.")
-
-    def compute_zupt_positions(self, accel_series, dt, window_size=10, threshold=0.6):
-        acc_signal = uniform_filter1d(np.array(accel_series), size=5)
-        zupt = np.zeros_like(acc_signal, dtype=bool)
-
-        # ZUPT detection via Mahalanobis-style thresholding
-        for i in range(window_size, len(acc_signal)):
-            window = acc_signal[i - window_size:i]
-            mu = np.mean(window)
-            sigma = np.var(window)
-            if sigma > 0:
-                dist = (acc_signal[i] - mu) / np.sqrt(sigma)
-            else:
-                dist = 0
-            if abs(dist) < threshold:
-                zupt[i] = True
-
-        # Integration with ZUPT
-        velocity = cumtrapz(acc_signal, dx=dt, initial=0)
-        velocity[zupt] = 0
-        position = cumtrapz(velocity, dx=dt, initial=0)
-        return position
\ No newline at end of file
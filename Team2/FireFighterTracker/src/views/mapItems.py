@@ -0,0 +1,123 @@
+import numpy as np
+from PyQt5.QtCore import Qt, QRectF
+from PyQt5.QtGui import QPen, QColor, QPolygonF, QImage
+from PyQt5.QtWidgets import QGraphicsItem
+
+
+class PointsItem(QGraphicsItem):
+    """One scene item drawing an (n, 2) array of points.
+
+    The points are copied straight into a QPolygonF's memory and drawn with a
+    single drawPoints (round dots, the pen width across) or drawPolyline
+    call, so the scene holds one item however many points there are.
+    """
+    def __init__(self, pen, polyline=False):
+        super().__init__()
+        self.pen = pen
+        self.polyline = polyline
+        self.polygon = QPolygonF()
+        self.rect = QRectF()
+
+    def set_points(self, xy):
+        xy = np.asarray(xy, dtype=np.float64).reshape(-1, 2)
+        polygon = QPolygonF(len(xy))
+        if len(xy):
+            ptr = polygon.data()
+            ptr.setsize(xy.nbytes)
+            np.frombuffer(ptr, dtype=np.float64).reshape(-1, 2)[:] = xy
+
+        margin = self.pen.widthF() / 2
+        self.prepareGeometryChange()
+        self.polygon = polygon
+        self.rect = polygon.boundingRect().adjusted(-margin, -margin, margin, margin)
+        self.update()
+
+    def boundingRect(self):
+        return self.rect
+
+    def paint(self, painter, option, widget=None):
+        painter.setPen(self.pen)
+        if self.polyline:
+            painter.drawPolyline(self.polygon)
+        else:
+            painter.drawPoints(self.polygon)
+
+
+class PointCloudItem(PointsItem):
+    """Draws a models.pointCloud.PointCloud, re-copying only when it changed"""
+    def __init__(self, pen=None):
+        if pen is None:
+            pen = QPen(QColor(0, 0, 255, 100), 10, Qt.SolidLine, Qt.RoundCap)  # Blue, 10px dots
+        super().__init__(pen)
+        self.version = None
+        self.setZValue(-1)  # under the wall lines
+
+    def sync(self, cloud):
+        if cloud.version != self.version:
+            self.version = cloud.version
+            self.set_points(cloud.xy())
+
+
+def trail_item(polyline=False):
+    """Green person trail, as 4px dots or a line"""
+    if polyline:
+        return PointsItem(QPen(QColor(0, 255, 0, 150), 2), polyline=True)
+    return PointsItem(QPen(QColor(0, 255, 0, 150), 4, Qt.SolidLine, Qt.RoundCap))
+
+
+class OccupancyGridItem(QGraphicsItem):
+    """Draws a models.occupancyGrid.OccupancyGrid from one cached QImage per tile.
+
+    sync() re-renders only the tiles the grid marked dirty since the last
+    sync, so a frame costs the same however large the map has grown. Cells
+    are shaded from white (free) to black (occupied), more opaque the surer
+    the grid is, and unseen cells are transparent.
+    """
+    def __init__(self):
+        super().__init__()
+        self.images = {}
+        self.rects = {}
+        self.rect = QRectF()
+        self.setZValue(-2)  # under the radar points
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption)
+
+    def tile_image(self, grid, tile):
+        l_max = max(grid.l_max, -grid.l_min)
+        grey = (255 / (1 + np.exp(tile))).astype(np.uint32)
+        alpha = np.minimum(np.abs(tile) * (510 / l_max), 255).astype(np.uint32)
+        argb = (alpha << 24) | (grey << 16) | (grey << 8) | grey
+        size = grid.tile_size
+        return QImage(argb.tobytes(), size, size, 4 * size, QImage.Format_ARGB32).copy()
+
+    def sync(self, grid):
+        dirty = grid.take_dirty()
+        if not dirty:
+            return
+
+        rect = self.rect
+        for key in dirty:
+            self.images[key] = self.tile_image(grid, grid.tiles[key])
+            if key not in self.rects:
+                self.rects[key] = QRectF(*grid.tile_rect(key))
+                rect = rect.united(self.rects[key])
+
+        if rect != self.rect:
+            self.prepareGeometryChange()
+            self.rect = rect
+        self.update()
+
+    def boundingRect(self):
+        return self.rect
+
+    def paint(self, painter, option, widget=None):
+        exposed = option.exposedRect
+        for key, image in self.images.items():
+            target = self.rects[key]
+            if target.intersects(exposed):
+                painter.drawImage(target, image)
+
+    def clear(self):
+        self.prepareGeometryChange()
+        self.images.clear()
+        self.rects.clear()
+        self.rect = QRectF()
@@ -7,244 +7,22 @@ from PyQt5.QtGui import QPolygonF
 from PyQt5 import QtGui
 from PyQt5.QtCore import QPointF
 from PyQt5.QtWidgets import QGraphicsScene, QGraphicsView
-import json
 import serial
 import serial.tools.list_ports
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from models.wallModel import WallMap
+from views.wallRenderer import WallRenderer
+from views.mapItems import PointCloudItem, OccupancyGridItem, trail_item
+from models.pointCloud import PointCloud
+from models.occupancyGrid import OccupancyGrid
+from controllers.frameScheduler import FrameScheduler
+from controllers.connections import SerialConnection
 
 import math
 
-class IncrementalLinearRegression:
-    def __init__(self,start_point_x,start_point_y,scene,line_radius=50):
-        self.n = 0
-        self.Sx = 0.0
-        self.Sy = 0.0
-        self.Sxx = 0.0
-        self.Sxy = 0.0
-        self.slope = 0.0
-        self.intercept = 0.0
-        self.end_points = [(start_point_x,start_point_y),(start_point_x,start_point_y)]
-        self.line_radius = line_radius
-        self.line_item = None
-        self.scene = scene
-        self.initial_x = start_point_x
-        self.initial_y = start_point_y
-        self.angle_tolerance = 1
-        self.starting_angle_tolerance = 90
-        self.slope_learning_rate = 1
-        self.number_of_points_for_established_trend = 10
-
-    def add_point(self, x, y):
-        self.n += 1
-        self.Sx += x
-        self.Sy += y
-        self.Sxx += x * x
-        self.Sxy += x * y
-
-        if self.n >= 2:
-            denominator = self.n * self.Sxx - self.Sx ** 2
-            if denominator != 0:
-                new_slope = (self.n * self.Sxy - self.Sx * self.Sy) / denominator
-                if self.n>2:
-                    current_angle = math.atan(self.slope)
-                    new_angle = math.atan(new_slope)
-                    angle_diff = abs(current_angle - new_angle)
-
-                    base_threshold = math.radians(self.starting_angle_tolerance)
-                    k = self.slope_learning_rate
-                    min_angle_tolerance = math.radians(self.angle_tolerance)  
-                    tolerance = max(min_angle_tolerance, base_threshold * math.exp(-k * (self.n - 2)))
-
-                    if angle_diff > tolerance:
-                        return False  
-
-                self.slope = new_slope
-                self.intercept = (self.Sy - self.slope * self.Sx) / self.n
-            
-        if self.n > 2:
-            self.update_end_points(x,y,self.n>self.number_of_points_for_established_trend)
-        else:
-            self.end_points[1] = (x,y)
-        
-        if self.n>=2:
-            self.draw_line()
-        return True
-
-    def predict(self, x):
-        return self.slope * x + self.intercept
-    
-    def predict_x(self, y):
-        if self.slope != 0:
-            return (y - self.intercept) / self.slope
-        else:
-            return self.initial_x
-    
-    def in_boundary(self,x,y):
-        (x0, y0), (x1, y1) = self.end_points
-
-        if x > min(x0, x1) and x < max(x0, x1) and y > min(y0, y1) and y < max(y0, y1):
-            return True
-        else:
-            return False
-        
-    def find_relevant_end_point(self,x,y):
-        distance = math.sqrt((x - self.end_points[0][0]) ** 2 + (y - self.end_points[0][1]) ** 2),math.sqrt((x - self.end_points[1][0]) ** 2 + (y - self.end_points[1][1]) ** 2)
-        index = 0 if distance[0] < distance[1] else 1
-        return index
-    
-    def in_line_radius(self,x,y,multiplier=1):
-        line_radius = self.line_radius*multiplier
-        if self.n >= 2:
-            if self.in_boundary(x,y):
-                distance = math.sqrt((x - self.predict_x(y)) ** 2 + (y - self.predict(x)) ** 2)
-            else:
-                distance = min(math.sqrt((x - self.end_points[0][0]) ** 2 + (y - self.end_points[0][1]) ** 2),math.sqrt((x - self.end_points[1][0]) ** 2 + (y - self.end_points[1][1]) ** 2))
-        else:   
-            distance = math.sqrt((x - self.initial_x) ** 2 + (y - self.initial_y) ** 2) 
-
-        
-        return distance < line_radius
-        
-    def update_end_points(self, x, y,established_trend=False): 
-        if (self.in_boundary(x,y))==False:
-            relevant_end_point = self.find_relevant_end_point(x, y)
-        
-            x1, y1 = self.end_points[relevant_end_point]
-            
-            # Handle the case where the x-values are equal to avoid division by zero
-            if x == x1:
-                slope_to_new_point = float('inf')  # or use None or a special value for vertical line
-            else:
-                slope_to_new_point = (y - y1) / (x - x1)
-            accept = False
-            if established_trend:
-                current_angle = math.atan(self.slope)
-                new_angle = math.atan(slope_to_new_point)
-                angle_diff = abs(current_angle - new_angle)
-
-                if angle_diff<math.radians(60):
-                    accept = True
-
-            if not established_trend or accept:
-                if (self.slope ** 2) < 1:
-                    new_y = self.predict(x)
-                    new_point = (self.predict_x(new_y), new_y)
-                else:
-                    new_x = self.predict_x(y)
-                    new_point = (new_x, self.predict(new_x))
-                self.end_points[relevant_end_point] = new_point
-                
-                        
-
-    def draw_line(self): 
-        self.erase_line()
-
-        wall_pen = QPen(QColor(0, 0, 255), 2)  # Blue
-
-        (x0, y0), (x1, y1) = self.end_points
-        self.line_item = self.scene.addLine(x0, y0, x1, y1, wall_pen)
-    
-    def erase_line(self):
-        if self.line_item:
-            self.scene.removeItem(self.line_item)
-            self.line_item = None
-
-    def combine_lines(self,other):
-        self.n += other.n
-        self.Sx += other.Sx
-        self.Sy += other.Sy
-        self.Sxx += other.Sxx
-        self.Sxy += other.Sxy
-
-        denominator = self.n * self.Sxx - self.Sx**2
-        if denominator != 0:
-            self.slope = (self.n * self.Sxy - self.Sx * self.Sy) / denominator
-            self.intercept = (self.Sy - self.slope * self.Sx) / self.n
-
-        other.erase_line()
-        self.update_end_points(other.end_points[0][0],other.end_points[0][1])
-        self.update_end_points(other.end_points[1][0],other.end_points[1][1])
-        self.draw_line()
-    
-    def can_combine_lines(self,other):
-        temp_n = self.n + other.n
-        tempSx = self.Sx + other.Sx
-        tempSy = self.Sy + other.Sy
-        tempSxx = self.Sxx + other.Sxx
-        tempSxy = self.Sxy + other.Sxy
-
-        if temp_n >= 2:
-            denominator = temp_n * tempSxx - tempSx ** 2
-            if denominator != 0:
-                new_slope = (temp_n * tempSxy - tempSx * tempSy) / denominator
-
-                self_current_angle = math.atan(self.slope)
-                other_current_angle = math.atan(other.slope)
-                new_angle = math.atan(new_slope)
-                self_angle_diff = abs(self_current_angle - new_angle)
-                other_angle_diff = abs(other_current_angle - new_angle)
-
-                base_threshold = math.radians(self.starting_angle_tolerance)
-                k = self.slope_learning_rate
-                min_angle_tolerance = math.radians(self.angle_tolerance)
-                tolerance = max(min_angle_tolerance, base_threshold * math.exp(-k * (temp_n - 2)))
-
-                if self_angle_diff > tolerance or other_angle_diff >tolerance:
-                    return False
-        
-        return True
-    
-    # returns true if the "other" line is merged into the "self" line
-    def connect_lines(self, other):
-        min_distance = float('inf')
-        closest_pair = None
-
-        for end_self in self.end_points:
-            for end_other in other.end_points:
-                distance = math.sqrt((end_self[0] - end_other[0]) ** 2 + (end_self[1] - end_other[1]) ** 2)
-                if distance < min_distance:
-                    min_distance = distance
-                    closest_pair = (end_self, end_other)
-        
-        if self.in_line_radius(closest_pair[1][0],closest_pair[1][1]):
-            if self.can_combine_lines(other):
-                self.combine_lines(other)
-                return True
-            
-        if other.n<2 and self.n<2:
-            return False
-        
-        if self.slope == other.slope:
-            return False
-
-        # Calculate intersection point of two lines: y = m1*x + c1 and y = m2*x + c2
-        try:
-            x_intersect = (other.intercept - self.intercept) / (self.slope - other.slope)
-            y_intersect = self.slope * x_intersect + self.intercept
-            intersection_point = (x_intersect, y_intersect)
-        except ZeroDivisionError:
-            return False
-        if self.in_line_radius(intersection_point[0],intersection_point[1],multiplier=2) and other.in_line_radius(intersection_point[0],intersection_point[1],multiplier = 2) and other.n>5 and self.n>5:
-            self.add_point(intersection_point[0],intersection_point[1])
-            other.add_point(intersection_point[0],intersection_point[1])
-        return False
-
-
-class DataConnection(QObject):
-    """Abstract base class for data connections"""
-    data_received = pyqtSignal(dict)
-    
-    def connect(self):
-        raise NotImplementedError
-        
-    def disconnect(self):
-        raise NotImplementedError
-
-
-
 class NewMapping(QWidget):
-    def __init__(self, stack, text="None"):
+    def __init__(self, stack, text="None", connection=None):
         super().__init__()
         self.stack = stack  # Store the reference to the stack
         self.setWindowTitle("Firefighter Tracker - No Page")
@@ -275,9 +53,17 @@ class NewMapping(QWidget):
         # Connection
         self.connection = None
 
-        self.lines = []
+        self.wall_map = WallMap()
+        self.point_cloud = PointCloud()
+        self.occupancy_grid = None  # built when the Occupancy Grid button is switched on
+        self.latest_data = None
+
+        # Packets are queued as they arrive and drawn at most 30 times a second
+        self.scheduler = FrameScheduler(self.process_data, self.update_display, fps=30, parent=self)
 
         self.scene = QGraphicsScene()
+        self.wall_renderer = WallRenderer(self.scene)
+        self.add_map_items()
         self.view = QGraphicsView(self.scene)
         self.view.setRenderHint(QtGui.QPainter.Antialiasing)
         self.view.setAlignment(Qt.AlignCenter)
@@ -289,7 +75,8 @@ class NewMapping(QWidget):
         self.view.scale(1, -1)  # Flip y-axis to match typical Cartesian plane
 
         self.initUI(text)
-        self.set_connection(SerialConnection(port=self.get_com_port(), baudrate=115200))
+        # Opens the serial port unless given another connection, such as a replay
+        self.set_connection(connection or SerialConnection(port=self.get_com_port(), baudrate=115200))
 
     def initUI(self, text):
 
@@ -369,14 +156,23 @@ class NewMapping(QWidget):
         btn_reset.clicked.connect(self.reset_painter)
         left_layout.addWidget(btn_reset, alignment=Qt.AlignCenter)
 
+        # Occupancy Grid Button
+        btn_grid = QPushButton("Occupancy Grid")
+        btn_grid.setObjectName("btnYes")
+        btn_grid.setCheckable(True)
+        btn_grid.toggled.connect(self.set_occupancy_grid)
+        left_layout.addWidget(btn_grid, alignment=Qt.AlignCenter)
+
         status_bar = QWidget()
         status_layout = QHBoxLayout()
         self.status_label = QLabel("Disconnected")
         self.data_count_label = QLabel("Packets: 0")
         self.lost_count_label = QLabel("Lost: 0")
+        self.backlog_label = QLabel("Backlog: 0")
         status_layout.addWidget(self.status_label)
         status_layout.addWidget(self.data_count_label)
         status_layout.addWidget(self.lost_count_label)
+        status_layout.addWidget(self.backlog_label)
         status_bar.setLayout(status_layout)
         left_layout.addWidget(status_bar, alignment=Qt.AlignCenter)
 
@@ -392,23 +188,24 @@ class NewMapping(QWidget):
     def set_connection(self, connection):
         """Set the data connection to use"""
         if self.connection:
+            self.connection.status_changed.disconnect()
             self.connection.disconnect()
             self.connection.data_received.disconnect()
         
         self.connection = connection
-        self.connection.data_received.connect(self.process_data)
+        self.connection.data_received.connect(self.scheduler.push)
+        self.connection.status_changed.connect(self.status_label.setText)
         self.connection.connect()
-        self.status_label.setText("Connected")
+        self.status_label.setText(self.connection.status)
     
 
     def process_data(self, data):
-        """Process incoming JSON data"""
+        """Apply one JSON packet to the model, drawing is left to update_display"""
         try:
             # Update packet counters
             self.packet_count += 1
             self.lost_packets += data.get("packets_lost", 0)
-            self.data_count_label.setText(f"Packets: {self.packet_count}")
-            self.lost_count_label.setText(f"Lost: {self.lost_packets}")
+            self.latest_data = data
             
             # Store IMU data
             self.imu_data.append(data)
@@ -416,7 +213,7 @@ class NewMapping(QWidget):
             # Store radar distance if valid
             if "distance" in data and 0 < data["distance"] < 1000:
                 self.radar_data.append((data["pitch"], data["yaw"], data["distance"]))
-                print(f"Added radar point: pitch={data["pitch"]}, yaw={data['yaw']}, distance={data['distance']}")  # Debug
+                print(f"Added radar point: pitch={data['pitch']}, yaw={data['yaw']}, distance={data['distance']}")  # Debug
                 
         
            # IMU sample with timestamp in milliseconds
@@ -447,33 +244,14 @@ class NewMapping(QWidget):
             if len(self.person_trail) > 50:
                 self.person_trail.pop(0)
             
-            def fmt(val):
-                try:
-                    return f"{float(val):.4f}"
-                except (TypeError, ValueError):
-                    return str(val) if val is not None else "--"
-
-            self.imu_label.setText(
-                f"Pitch: {fmt(data.get('pitch', '--'))}  Roll: {fmt(data.get('roll', '--'))}  Yaw: {fmt(data.get('yaw', '--'))}"
-            )
-            self.distance_label.setText(
-                f"Distance: {fmt(data.get('distance', '--'))}"
-            )
-            self.accel_label.setText(
-                f"Accel X: {fmt(data.get('accel_x', '--'))}  Y: {fmt(data.get('accel_y', '--'))}  Z: {fmt(data.get('accel_z', '--'))}"
-            )
-            
-            self.update_display()
+            if "distance" in data and 0 < data["distance"] < 1000:
+                self.map_radar_point()
                 
         except Exception as e:
             print(f"Error processing data: {e}")
-    
-    def update_display(self):
-        """Update the minimap display"""
-        
-        # Draw radar walls (blue)
-        wall_pen = QPen(QColor(0, 0, 255), 2)
-        wall_brush = QBrush(QColor(0, 0, 255, 100))  # More opaque blue
+
+    def map_radar_point(self):
+        """Add the newest radar reading to the point cloud and wall model"""
         pitch= self.radar_data[-1][0]
         pitch_radians = -math.radians(pitch)
         yaw = self.radar_data[-1][1]
@@ -484,44 +262,67 @@ class NewMapping(QWidget):
         x = self.current_position.x() + scaled_distance * math.cos(pitch_radians) * math.cos(yaw_radians)
         y = self.current_position.y() + scaled_distance * math.cos(pitch_radians) * math.sin(yaw_radians)
           
-        # Draw wall point (larger size: 10x10 pixels)
-        self.scene.addEllipse(x-5, y-5, 10, 10, wall_pen, wall_brush)
-        
-        matched = False
-        for line in self.lines:
-            if line.in_line_radius(x, y):
-                matched = True
-                line.add_point(x, y)
-                
+        # Wall point, one per 5px cell
+        self.point_cloud.add(x, y)
+        self.wall_map.add_point(x, y)
+        if self.occupancy_grid is not None:
+            self.occupancy_grid.add_return(self.current_position.x(), self.current_position.y(), x, y)
+
+    def update_display(self):
+        """Redraw the labels and minimap, called once per frame by the scheduler"""
+        self.data_count_label.setText(f"Packets: {self.packet_count}")
+        self.lost_count_label.setText(f"Lost: {self.lost_packets}")
+        self.backlog_label.setText(f"Backlog: {self.scheduler.backlog}  Rate: {self.scheduler.rate:.0f}/s")
+
+        data = self.latest_data
+        if data is None:
+            return
+
+        def fmt(val):
+            try:
+                return f"{float(val):.4f}"
+            except (TypeError, ValueError):
+                return str(val) if val is not None else "--"
+
+        self.imu_label.setText(
+            f"Pitch: {fmt(data.get('pitch', '--'))}  Roll: {fmt(data.get('roll', '--'))}  Yaw: {fmt(data.get('yaw', '--'))}"
+        )
+        self.distance_label.setText(
+            f"Distance: {fmt(data.get('distance', '--'))}"
+        )
+        self.accel_label.setText(
+            f"Accel X: {fmt(data.get('accel_x', '--'))}  Y: {fmt(data.get('accel_y', '--'))}  Z: {fmt(data.get('accel_z', '--'))}"
+        )
 
-        if not matched:
-            print("new line")
-            new_line = IncrementalLinearRegression(start_point_x=x,start_point_y=y,scene=self.scene)
-            new_line.add_point(x, y)
-            self.lines.append(new_line)
-
-        resolved_lines = []
-        i =0
-        while len(resolved_lines)<len(self.lines):
-            j = i+1
-            while j<len(self.lines):
-                removed = self.lines[i].connect_lines(self.lines[j])
-                if removed:
-                    self.lines.pop(j)
-                else:
-                    j=j+1
-            resolved_lines.append(self.lines[i])
-            i+=1
-        self.lines = resolved_lines
+        self.cloud_item.sync(self.point_cloud)
+        self.wall_renderer.sync(self.wall_map)
+        if self.occupancy_grid is not None:
+            self.grid_item.sync(self.occupancy_grid)
 
         # Draw person trail as green points
-        trail_pen = QPen(QColor(0, 255, 0, 150), 2)
-        trail_brush = QBrush(QColor(0, 255, 0, 150))
-        for point in self.person_trail:
-            self.scene.addEllipse(point.x() - 2, point.y() - 2, 4, 4, trail_pen, trail_brush)
+        self.trail_item.set_points([(p.x(), p.y()) for p in self.person_trail])
         # Draw person (red circle with direction arrow)
         self.draw_person()
         
+    def add_map_items(self):
+        """Radar points and trail are one scene item each, updated in place"""
+        self.cloud_item = PointCloudItem()
+        self.trail_item = trail_item()
+        self.grid_item = OccupancyGridItem()
+        self.grid_item.setVisible(self.occupancy_grid is not None)
+        self.scene.addItem(self.cloud_item)
+        self.scene.addItem(self.trail_item)
+        self.scene.addItem(self.grid_item)
+
+    def set_occupancy_grid(self, enabled):
+        """Build an occupancy grid from the radar returns alongside the wall lines"""
+        if enabled:
+            self.occupancy_grid = OccupancyGrid()
+        else:
+            self.occupancy_grid = None
+            self.grid_item.clear()
+        self.grid_item.setVisible(enabled)
+
     def draw_person(self):
         """Draw the person with direction arrow, removing previous graphics"""
         # Remove previous person graphics if they exist
@@ -585,7 +386,12 @@ class NewMapping(QWidget):
 
     def reset_painter(self):
         self.scene.clear()
-        self.lines.clear()
+        self.wall_map.clear()
+        self.wall_renderer.clear()
+        self.point_cloud.clear()
+        if self.occupancy_grid is not None:
+            self.occupancy_grid.clear()
+        self.add_map_items()
         self.person_trail.clear()
         self.person_graphics.clear()
         self.current_position = QPointF(0, 0)
@@ -622,42 +428,3 @@ class NewMapping(QWidget):
         except FileNotFoundError:
             print("Log: Stylesheet not found. Using default styles.")
 
-class SerialConnection(DataConnection):
-    """Serial connection implementation"""
-    def __init__(self, port, baudrate):
-        super().__init__()
-        self.port = port
-        self.baudrate = baudrate
-        self.serial = None
-        
-    def connect(self):
-        try:
-            import serial
-            self.serial = serial.Serial(self.port, self.baudrate, timeout=1)
-            self.status = "Connected"
-            
-            # Start reading thread
-            self.read_timer = QTimer()
-            self.read_timer.timeout.connect(self.read_data)
-            self.read_timer.start(10)
-            
-        except Exception as e:
-            print(f"Serial connection error: {e}")
-            self.status = "Connection failed"
-            
-    def disconnect(self):
-        if self.serial and self.serial.is_open:
-            self.serial.close()
-        if hasattr(self, 'read_timer'):
-            self.read_timer.stop()
-        self.status = "Disconnected"
-            
-    def read_data(self):
-        if self.serial and self.serial.in_waiting:
-            try:
-                line = self.serial.readline().decode('utf-8').strip()
-                if line:
-                    data = json.loads(line)
-                    self.data_received.emit(data)
-            except Exception as e:
-                print(f"Error reading serial data: {e}")
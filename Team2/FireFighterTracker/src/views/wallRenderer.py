@@ -0,0 +1,36 @@
+from PyQt5.QtGui import QPen, QColor
+
+
+class WallRenderer:
+    """Keeps one QGraphicsLineItem per wall line in step with a WallMap.
+
+    Call sync() once per frame. Only lines the model changed since the last
+    sync are touched, and existing items are moved with setLine rather than
+    removed and re-added.
+    """
+    def __init__(self, scene, pen=None):
+        self.scene = scene
+        self.pen = pen if pen is not None else QPen(QColor(0, 0, 255), 2)  # Blue
+        self.items = {}
+
+    def sync(self, wall_map):
+        changed, removed = wall_map.take_changes()
+
+        for line in removed:
+            item = self.items.pop(line, None)
+            if item is not None:
+                self.scene.removeItem(item)
+
+        for line in changed:
+            if line.n < 2:
+                continue
+            (x0, y0), (x1, y1) = line.end_points
+            item = self.items.get(line)
+            if item is None:
+                self.items[line] = self.scene.addLine(x0, y0, x1, y1, self.pen)
+            else:
+                item.setLine(x0, y0, x1, y1)
+
+    def clear(self):
+        """Forget the items, for after scene.clear() has deleted them"""
+        self.items.clear()
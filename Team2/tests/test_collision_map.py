@@ -0,0 +1,65 @@
+import math
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "FireFighterTracker", "src"))
+
+pytest.importorskip("cv2")
+
+from models.collisionMap import CollisionMap
+
+
+@pytest.fixture
+def maze():
+    rng = np.random.default_rng(1)
+    maze = np.zeros((40, 60), np.uint8)
+    maze[10, 5:50] = 1
+    maze[15:38, 30] = 1
+    maze[rng.integers(0, 40, 30), rng.integers(0, 60, 30)] = 1
+    return maze
+
+
+def test_window_counts_match_slicing(maze):
+    collisions = CollisionMap(maze)
+    rng = np.random.default_rng(2)
+    for r0, c0, h, w in rng.integers(-5, 60, size=(500, 4)):
+        expected = maze[max(r0, 0):max(r0 + h % 15, 0), max(c0, 0):max(c0 + w % 15, 0)].sum()
+        assert collisions.walls_in(r0, c0, r0 + h % 15, c0 + w % 15) == expected
+
+
+def test_hits_rect_in_scene_units(maze):
+    collisions = CollisionMap(maze, tile_size=4)
+    # the wall row 10 covers y 40..44 from x 20 to 200
+    assert collisions.hits_rect(100, 35, 110, 41)
+    assert not collisions.hits_rect(100, 30, 110, 40)  # touching its top edge
+    assert not collisions.hits_rect(-20, -20, -1, -1)
+
+
+def test_clearance_is_euclidean(maze):
+    collisions = CollisionMap(maze, tile_size=2)
+    walls = np.argwhere(maze == 1)
+    for row, col in [(0, 0), (25, 10), (39, 59), (10, 20)]:
+        expected = np.min(np.hypot(walls[:, 0] - row, walls[:, 1] - col)) * 2
+        assert collisions.clearance(col * 2 + 1, row * 2 + 1) == pytest.approx(expected, abs=1e-4)
+
+
+def test_snap_moves_to_nearest_clear_cell(maze):
+    collisions = CollisionMap(maze)
+    assert collisions.snap(20.5, 25.5, clearance=1) == (20.5, 25.5)
+
+    x, y = collisions.snap(20.5, 10.5, clearance=2)
+    assert collisions.clearance(x, y) > 2
+    clear = np.argwhere(collisions.distance > 2)
+    best = np.min(np.hypot(clear[:, 0] + 0.5 - 10.5, clear[:, 1] + 0.5 - 20.5))
+    assert math.hypot(x - 20.5, y - 10.5) <= best + 1
+
+    assert collisions.snap(20.5, 10.5, clearance=100) is None
+
+
+def test_empty_maze_has_no_walls():
+    collisions = CollisionMap(np.zeros((5, 5), np.uint8))
+    assert not collisions.hits_rect(0, 0, 5, 5)
+    assert collisions.clearance(2, 2) == math.inf
@@ -0,0 +1,127 @@
+import json
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "FireFighterTracker", "src"))
+
+QtCore = pytest.importorskip("PyQt5.QtCore")
+
+from controllers.connections import LineParser, ReplayConnection, SerialConnection
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+
+def encode(packets):
+    return b"".join(json.dumps(packet).encode() + b"\r\n" for packet in packets)
+
+
+def test_lines_split_across_chunks():
+    packets = [{"sequence": i, "yaw": i * 1.5} for i in range(50)]
+    stream = encode(packets)
+
+    parser = LineParser()
+    parsed = []
+    for start in range(0, len(stream), 37):
+        parsed += parser.feed(stream[start:start + 37])
+
+    assert parsed == packets
+    assert parser.tail == b""
+
+
+def test_bad_lines_are_skipped():
+    parser = LineParser()
+    parsed = parser.feed(b'{"sequence": 1}\n{"sequ\n\n[1, 2]\n{"sequence": 2}\n{"seq')
+
+    assert parsed == [{"sequence": 1}, {"sequence": 2}]
+    assert parser.bad_lines == 2
+    assert parser.tail == b'{"seq'
+
+
+def test_serial_packets_arrive_in_batches(app):
+    pytest.importorskip("serial")
+    connection = SerialConnection("loop://", 115200, timeout=0.05)
+    batches = []
+    connection.data_received.connect(batches.append)
+    connection.connect()
+    assert connection.status == "Connected"
+
+    packets = [{"sequence": i} for i in range(2000)]
+    connection.serial.write(encode(packets))
+
+    deadline = time.monotonic() + 5
+    while sum(map(len, batches)) < len(packets) and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.01)
+    connection.disconnect()
+
+    assert [packet for batch in batches for packet in batch] == packets
+    assert len(batches) < len(packets)
+    assert connection.status == "Disconnected"
+
+
+def replay(app, connection, timeout=5):
+    batches = []
+    connection.data_received.connect(batches.append)
+    connection.connect()
+    deadline = time.monotonic() + timeout
+    while connection.status == "Connected" and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.001)
+    return batches
+
+
+def test_replay_follows_timestamps(app, tmp_path):
+    # 10ms apart, with a restart (timestamp going back) and a long pause
+    timestamps = list(range(0, 200, 10)) + [5, 15, 60000, 60010]
+    packets = [{"sequence": i, "timestamp": t} for i, t in enumerate(timestamps)]
+    capture = tmp_path / "raw_data_test.json"
+    capture.write_bytes(encode(packets) + b"Diagnostic line\n")
+
+    connection = ReplayConnection(str(capture), speed=2, max_gap=0.5)
+    batches = replay(app, connection)
+
+    assert connection.status == "Finished"
+    assert [packet for batch in batches for packet in batch] == packets
+    assert connection.times[19:] == pytest.approx([0.19, 0.19, 0.2, 0.7, 0.71])
+    # 0.71s of capture at 2x
+    assert 0.3 < connection.elapsed < 1.0
+    assert len(batches) > 5
+
+
+def test_replay_as_fast_as_possible(app, tmp_path):
+    packets = [{"sequence": i, "timestamp": i * 1000} for i in range(500)]
+    capture = tmp_path / "raw_data_test.json"
+    capture.write_bytes(encode(packets))
+
+    connection = ReplayConnection(str(capture), speed=None)
+    batches = replay(app, connection)
+
+    assert batches == [packets]
+    assert connection.elapsed < 1.0
+
+
+def test_lost_port_sets_status(app):
+    pytest.importorskip("serial")
+    connection = SerialConnection("loop://", 115200, timeout=0.05)
+    statuses = []
+    connection.status_changed.connect(statuses.append)
+    connection.connect()
+
+    def broken_read(size):
+        raise OSError("device unplugged")
+    connection.serial.read = broken_read
+
+    deadline = time.monotonic() + 5
+    while connection.status == "Connected" and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.01)
+
+    assert connection.status == "Connection failed"
+    assert statuses[0] == "Connected" and statuses[-1] == "Connection failed"
+    assert connection.reader is None
@@ -0,0 +1,79 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "FireFighterTracker", "src"))
+
+QtCore = pytest.importorskip("PyQt5.QtCore")
+
+from controllers.frameScheduler import FrameScheduler
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+
+class Clock:
+    """Advances by `step` seconds every time it is read"""
+    def __init__(self, step):
+        self.step = step
+        self.now = 0.0
+
+    def __call__(self):
+        self.now += self.step
+        return self.now
+
+
+def test_burst_is_spread_over_frames(app):
+    applied, frames = [], []
+    # each clock read costs 5ms, a frame at 30fps with budget 0.6 is 20ms
+    scheduler = FrameScheduler(applied.append, lambda: frames.append(len(applied)), clock=Clock(0.005))
+    scheduler.stop()
+
+    scheduler.push(list(range(10)))
+    scheduler.push(10)
+    assert scheduler.backlog == 11
+
+    scheduler.frame()
+    assert applied == [0, 1, 2, 3]
+    assert frames == [4]
+    assert scheduler.backlog == 7
+
+    while scheduler.backlog:
+        scheduler.frame()
+    assert applied == list(range(11))
+    assert scheduler.applied == 11
+    assert len(frames) == 3
+
+
+def test_no_render_without_packets(app):
+    frames = []
+    scheduler = FrameScheduler(lambda data: None, lambda: frames.append(1))
+    scheduler.stop()
+
+    scheduler.frame()
+    assert frames == []
+
+
+def test_slow_packet_still_progresses(app):
+    applied = []
+    scheduler = FrameScheduler(applied.append, lambda: None, clock=Clock(1.0))
+    scheduler.stop()
+
+    scheduler.push([{"distance": 1}, {"distance": 2}])
+    scheduler.frame()
+    assert applied == [{"distance": 1}]
+
+
+def test_rate_is_packets_per_second(app):
+    clock = Clock(0.0)
+    scheduler = FrameScheduler(lambda data: None, lambda: None, clock=clock)
+    scheduler.stop()
+
+    for _ in range(30):
+        scheduler.push(list(range(20)))
+        scheduler.frame()
+        clock.now += 0.05
+    assert scheduler.rate == pytest.approx(400, rel=0.1)
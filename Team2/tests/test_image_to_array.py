@@ -0,0 +1,64 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "FireFighterTracker", "src"))
+
+cv2 = pytest.importorskip("cv2")
+
+from controllers import imageToArray
+
+
+@pytest.fixture
+def plan(tmp_path):
+    image = np.full((90, 120), 255, np.uint8)
+    image[10:15, 5:100] = 0
+    image[20:80, 60:65] = 0
+    path = str(tmp_path / "plan.png")
+    cv2.imwrite(path, image)
+    return path
+
+
+def test_maze_is_cached_next_to_the_image(plan, monkeypatch):
+    pyramid = imageToArray.load_maze(plan, 60, 80, blur_effect=100)
+    np.testing.assert_array_equal(pyramid[0], imageToArray.floorplan_to_maze(plan, 60, 80, 100))
+    cache = imageToArray.maze_cache_path(plan, 60, 80, blur_effect=100)
+    assert os.path.dirname(cache) == os.path.dirname(plan)
+    assert os.path.exists(cache)
+
+    def no_opencv(*args):
+        raise AssertionError("maze should have come from the cache")
+
+    monkeypatch.setattr(imageToArray, "floorplan_to_maze", no_opencv)
+    cached = imageToArray.load_maze(plan, 60, 80, blur_effect=100)
+    assert len(cached) == len(pyramid)
+    for level, expected in zip(cached, pyramid):
+        np.testing.assert_array_equal(level, expected)
+
+    with pytest.raises(AssertionError):
+        imageToArray.load_maze(plan, 60, 80, blur_effect=50)
+
+
+def test_changed_image_is_not_read_from_cache(plan):
+    before = imageToArray.load_maze(plan)[0]
+    image = cv2.imread(plan, cv2.IMREAD_GRAYSCALE)
+    image[40:45, :] = 0
+    cv2.imwrite(plan, image)
+    os.utime(plan, ns=(0, 12345))
+
+    after = imageToArray.load_maze(plan)[0]
+    assert after.sum() > before.sum()
+
+
+def test_pyramid_keeps_walls():
+    maze = np.zeros((7, 10), np.uint8)
+    maze[3, 9] = 1
+    maze[6, 0] = 1
+    pyramid = imageToArray.maze_pyramid(maze, levels=3)
+
+    assert [level.shape for level in pyramid] == [(7, 10), (4, 5), (2, 3)]
+    assert pyramid[1][1, 4] == pyramid[1][3, 0] == 1
+    assert pyramid[1].sum() == 2
+    assert pyramid[2][0, 2] == pyramid[2][1, 0] == 1
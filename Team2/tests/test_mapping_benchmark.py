@@ -0,0 +1,29 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "FireFighterTracker", "src"))
+
+import mappingBenchmark
+
+
+def test_segment_distances():
+    segments = np.array([[0, 0, 10, 0], [0, 0, 0, 10]], dtype=float)
+    points = np.array([[5, 3], [-3, -4], [20, 0], [2, 8]], dtype=float)
+    assert mappingBenchmark.segment_distances(points, segments) == pytest.approx([3, 5, 10, 2])
+
+
+def test_small_room_is_mapped(monkeypatch, tmp_path):
+    pytest.importorskip("matplotlib")
+    monkeypatch.chdir(tmp_path)
+
+    result = mappingBenchmark.benchmark(room_size=5, steps=600, clock="cpu")
+    assert result["points"] == 600
+    assert 5 <= result["lines"] <= 8
+    assert result["error_cm"] < 10
+    assert result["coverage"] > 0.9
+    assert result["p50_us"] <= result["p99_us"] <= result["max_us"]
+    assert result["peak_kib"] > 0
+    assert list(tmp_path.iterdir()) == []  # the simulator's logs folder went in a scratch directory
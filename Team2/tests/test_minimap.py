@@ -0,0 +1,112 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "FireFighterTracker", "src"))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+cv2 = pytest.importorskip("cv2")
+QtWidgets = pytest.importorskip("PyQt5.QtWidgets")
+from PyQt5.QtCore import QRectF
+from PyQt5.QtGui import QImage, QPainter
+
+from controllers.imageToArray import maze_pyramid
+from controllers.minimap import FloorPlan, MazeTilesItem
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+@pytest.fixture
+def floor_plan(app, tmp_path):
+    image = np.full((60, 80), 255, np.uint8)
+    image[10:14, 5:70] = 0
+    image[20:55, 40:44] = 0
+    path = str(tmp_path / "plan.png")
+    cv2.imwrite(path, image)
+    return FloorPlan(path, width=80, height=60, tile_size=3)
+
+
+def test_maze_is_one_item(floor_plan):
+    assert len(floor_plan.scene.items()) == 2  # the maze and the player
+    assert floor_plan.maze_item.boundingRect() == QRectF(0, 0, 60 * 3, 80 * 3)
+
+
+def test_tiles_match_the_maze():
+    rng = np.random.default_rng(0)
+    maze = (rng.random((70, 100)) < 0.2).astype(np.uint8)
+    item = MazeTilesItem(maze_pyramid(maze), cell_size=2, tile_cells=32, cache_size=4)
+
+    image = item.tile(0, 2, 3)  # the partial tile in the bottom right corner
+    assert (image.width(), image.height()) == (4, 6)
+    for row in range(6):
+        for col in range(4):
+            assert (image.pixelColor(col, row).alpha() == 255) == bool(maze[64 + row, 96 + col])
+
+    for key in [(0, 0, 0), (0, 0, 1), (1, 0, 0), (0, 0, 0), (0, 1, 0)]:
+        item.tile(*key)
+    # the least recently used tile went first
+    assert list(item.tiles) == [(0, 0, 1), (1, 0, 0), (0, 0, 0), (0, 1, 0)]
+
+
+def paint(item, scale, exposed):
+    image = QImage(200, 200, QImage.Format_ARGB32)
+    painter = QPainter(image)
+    painter.scale(scale, scale)
+    option = QtWidgets.QStyleOptionGraphicsItem()
+    option.exposedRect = exposed
+    item.paint(painter, option)
+    painter.end()
+
+
+def test_only_visible_tiles_of_one_level_are_made():
+    maze = np.zeros((1000, 1000), np.uint8)
+    item = MazeTilesItem(maze_pyramid(maze), cell_size=1, tile_cells=100)
+
+    paint(item, 2.0, QRectF(150, 150, 100, 100))
+    assert set(item.tiles) == {(0, r, c) for r in (1, 2) for c in (1, 2)}
+
+    item.tiles.clear()
+    # a quarter of a pixel per cell reads level 2, whose tiles cover 400 units
+    paint(item, 0.25, QRectF(0, 0, 1000, 1000))
+    assert set(item.tiles) == {(2, r, c) for r in range(3) for c in range(3)}
+    assert item.level_for(0.001) == 3
+
+
+def test_zoom_is_limited(floor_plan):
+    view = floor_plan.view
+    view.zoom(1e6)
+    assert view.transform().m11() == pytest.approx(view.max_scale)
+    view.zoom(1e-6)
+    # the 180x240 plan fits the 80x60 view at a quarter
+    assert view.transform().m11() == pytest.approx(0.25)
+
+
+def test_hits_wall_matches_tiles(floor_plan):
+    maze = floor_plan.floor_plan
+    tile = floor_plan.tile_size
+    rng = np.random.default_rng(0)
+    for x, y in rng.uniform(-10, maze.shape[1] * tile, size=(500, 2)):
+        rect = QRectF(x, y, 11, 11)
+        expected = any(QRectF(c * tile - 0.5, r * tile - 0.5, tile + 1, tile + 1).intersects(rect)
+                       for r, c in np.argwhere(maze == 1))
+        assert floor_plan.hits_wall(rect) == expected
+
+
+def test_tracked_steps_stay_out_of_walls(floor_plan):
+    floor_plan.tracker.rng = np.random.default_rng(0)
+    # the long wall is resized into maze rows 14-18, start above it and walk
+    # right with the heading drifting down into it
+    top = np.argwhere(floor_plan.floor_plan == 1)[0][0] * floor_plan.tile_size
+    floor_plan.tracker.reset(30, top - 12)
+    for _ in range(20):
+        floor_plan.track_step(4, 15)
+
+    x, y = floor_plan.player_centre()
+    assert y < top
+    assert x > 80
+    assert len(floor_plan.trail) == floor_plan.trail_size
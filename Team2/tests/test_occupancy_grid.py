@@ -0,0 +1,48 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "FireFighterTracker", "src"))
+
+from models.occupancyGrid import OccupancyGrid
+
+
+@pytest.mark.parametrize("end", [(97, 31), (-40, 212), (3, -3), (-250, -249), (0, 0)])
+def test_ray_cells_are_connected(end):
+    grid = OccupancyGrid(cell_size=1)
+    cx, cy = grid.ray_cells(0.5, 0.5, *end)
+
+    assert (cx[0], cy[0]) == (0, 0)
+    assert (cx[-1], cy[-1]) == grid.cell(*end)
+    steps = np.abs(np.diff(np.column_stack([cx, cy]), axis=0))
+    assert np.all(steps.max(axis=1) == 1)
+
+
+def test_return_marks_free_and_occupied():
+    grid = OccupancyGrid(cell_size=5, tile_size=8)
+    for _ in range(20):
+        grid.add_return(-12, 3, 180, -95)
+
+    cx, cy = grid.ray_cells(-12, 3, 180, -95)
+    middle = len(cx) // 2
+    assert grid.log_odds(180, -95) == grid.l_max
+    assert grid.log_odds((cx[middle] + 0.5) * 5, (cy[middle] + 0.5) * 5) == grid.l_min
+    assert grid.log_odds(84, 46) == 0
+    assert grid.probability(180, -95) > 0.95
+    # the ray crosses tile boundaries and negative coordinates, only the tiles it touched exist
+    tiles = set(zip((cx // 8).tolist(), (cy // 8).tolist()))
+    assert len(tiles) > 4
+    assert set(grid.tiles) == grid.take_dirty() == tiles
+    assert grid.take_dirty() == set()
+
+
+def test_long_returns_only_clear():
+    grid = OccupancyGrid(cell_size=5, max_range=100)
+    grid.add_return(0, 0, 300, 0)
+
+    assert grid.log_odds(50, 0) == pytest.approx(grid.l_free)
+    assert grid.log_odds(100, 0) == pytest.approx(grid.l_free)
+    assert grid.log_odds(110, 0) == 0
+    assert grid.log_odds(300, 0) == 0
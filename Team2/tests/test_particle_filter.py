@@ -0,0 +1,78 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "FireFighterTracker", "src"))
+
+from models.particleFilter import ParticleFilter
+
+
+@pytest.fixture
+def corridor():
+    # a corridor 10 cells high between two walls, closed at the right end
+    maze = np.zeros((30, 100), np.uint8)
+    maze[9, :] = 1
+    maze[20, :] = 1
+    maze[:, 90] = 1
+    return maze
+
+
+def test_blocked_moves(corridor):
+    tracker = ParticleFilter(corridor, tile_size=2, count=4)
+    start = np.array([[20.0, 30.0], [20.0, 30.0], [20.0, 30.0], [20.0, 30.0]])
+    end = np.array([[60.0, 30.0],    # along the corridor
+                    [20.0, 10.0],    # through the wall at row 9
+                    [20.0, 60.0],    # out past row 20
+                    [-5.0, 30.0]])   # off the plan
+    assert tracker.blocked(start, end).tolist() == [False, True, True, True]
+
+
+def test_long_moves_are_checked_along_their_length(corridor):
+    tracker = ParticleFilter(corridor, count=1, max_samples=400)
+    # starts and ends in open space on either side of the wall at row 9
+    assert tracker.blocked(np.array([[10.0, 5.0]]), np.array([[80.0, 15.0]])).tolist() == [True]
+
+
+def test_drift_is_kept_in_the_corridor(corridor):
+    tracker = ParticleFilter(corridor, count=3000, step_noise=0.1, heading_noise=10, seed=0)
+    tracker.reset(10, 15, spread=1)
+
+    # the heading is 20 degrees off, dead reckoning alone would end at y = 15 + 60 * sin(20) = 35.5
+    for _ in range(10):
+        assert tracker.step(6, 20)
+    x, y = tracker.mean()
+    assert 10 < y < 20
+    assert x > 40
+    assert tracker.effective_count() > 100
+
+
+def test_step_into_a_dead_end_is_dropped(corridor):
+    tracker = ParticleFilter(corridor, count=500, seed=0)
+    tracker.reset(85, 15)
+
+    assert not tracker.step(20, 0)
+    assert tracker.mean() == pytest.approx((85, 15))
+    assert tracker.lost_steps == 1
+
+
+def test_systematic_resampling_follows_the_weights(corridor):
+    tracker = ParticleFilter(corridor, count=1000, seed=0)
+    tracker.particles = np.repeat([[1.0, 0.0], [2.0, 0.0], [3.0, 0.0], [4.0, 0.0]], 250, axis=0)
+    tracker.weights = np.repeat([0.1, 0.2, 0.3, 0.4], 250) / 250
+
+    tracker.resample()
+    values, counts = np.unique(tracker.particles[:, 0], return_counts=True)
+    assert values.tolist() == [1, 2, 3, 4]
+    # systematic picks are within one of weight * count
+    assert np.all(np.abs(counts - [100, 200, 300, 400]) <= 1)
+    assert tracker.weights == pytest.approx(np.full(1000, 1e-3))
+
+
+def test_thin_wall_is_caught_up_to_max_step(corridor):
+    tracker = ParticleFilter(corridor, tile_size=2, count=1, max_samples=16)
+    assert tracker.max_step() == 15
+    # straight down from row 5 through the one cell wall at row 9, ending at row 12
+    start = np.array([[21.0, 11.0]])
+    assert tracker.blocked(start, start + [0, 14]).tolist() == [True]
@@ -0,0 +1,43 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "FireFighterTracker", "src"))
+
+from models.pointCloud import PointCloud
+
+
+def test_one_point_per_cell():
+    cloud = PointCloud(cell_size=5)
+    for _ in range(100):
+        for x in range(0, 50, 2):
+            cloud.add(float(x), 1.0)
+
+    assert len(cloud) == 10
+    assert np.all(cloud.xy()[:, 1] == 1.0)
+    assert sorted(cloud.xy()[:, 0] // 5) == list(range(10))
+
+
+def test_oldest_points_are_overwritten():
+    cloud = PointCloud(cell_size=1, max_points=100)
+    for x in range(250):
+        cloud.add(float(x), 0.0)
+
+    assert len(cloud) == 100
+    assert sorted(cloud.xy()[:, 0]) == list(range(150, 250))
+    # an evicted cell can be filled again
+    assert cloud.add(0.0, 0.0)
+    assert len(cloud.cells) == 100
+
+
+def test_version_only_changes_with_points():
+    cloud = PointCloud(cell_size=10)
+    cloud.add(1.0, 1.0)
+    version = cloud.version
+    cloud.add(2.0, 2.0)
+    assert cloud.version == version
+
+    cloud.clear()
+    assert len(cloud) == 0 and cloud.version != version
+    assert cloud.add(2.0, 2.0)
@@ -0,0 +1,53 @@
+import math
+import os
+import random
+import sys
+
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "FireFighterTracker", "src"))
+
+from models.spatialIndex import SegmentGrid
+
+
+def brute_near(boxes, x, y, padding):
+    return {k for k, (x0, y0, x1, y1) in boxes.items()
+            if x0 - padding <= x <= x1 + padding and y0 - padding <= y <= y1 + padding}
+
+
+def test_near_point_is_superset_of_padded_boxes():
+    rng = random.Random(1)
+    grid = SegmentGrid(cell_size=50, padding=100)
+    boxes = {}
+    for k in range(200):
+        x0, y0 = rng.uniform(-2000, 2000), rng.uniform(-2000, 2000)
+        boxes[k] = (x0, y0, x0 + rng.uniform(0, 300), y0 + rng.uniform(0, 300))
+        grid.update(k, boxes[k])
+
+    for _ in range(500):
+        x, y = rng.uniform(-2200, 2200), rng.uniform(-2200, 2200)
+        assert brute_near(boxes, x, y, 100) <= grid.near_point(x, y)
+
+
+def test_update_moves_and_remove_forgets():
+    grid = SegmentGrid(cell_size=10)
+    grid.update("a", (0, 0, 5, 5))
+    assert grid.near_point(2, 2) == {"a"}
+
+    grid.update("a", (100, 100, 105, 105))
+    assert grid.near_point(2, 2) == set()
+    assert grid.near_point(102, 102) == {"a"}
+
+    grid.remove("a")
+    assert len(grid) == 0
+    assert grid.cells == {}
+
+
+def test_oversized_boxes_are_always_candidates():
+    grid = SegmentGrid(cell_size=10, max_cells=16)
+    grid.update("wall", (-1e9, 0, 1e9, 1))
+    grid.update("nan", (math.nan, 0, 0, 0))
+    grid.update("dot", (0, 0, 1, 1))
+
+    assert grid.near_point(5000, 5000) == {"wall", "nan"}
+    assert grid.near_item("dot") == {"wall", "nan"}
+    assert grid.near_item("wall") == {"nan", "dot"}
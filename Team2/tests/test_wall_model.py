@@ -0,0 +1,150 @@
+import math
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "FireFighterTracker", "src"))
+
+from models.wallModel import LineMoments, WallLine, WallMap, angle_between
+
+
+def room_points(rng, rooms, per_room, size=250, spacing=300, noise=3):
+    """Noisy points on the walls of a grid of square rooms"""
+    points = []
+    for room in range(rooms):
+        ox, oy = (room % 3) * spacing, (room // 3) * spacing
+        for _ in range(per_room):
+            t = rng.uniform(0, size)
+            x, y = [(t, 0), (size, t), (t, size), (0, t)][rng.randrange(4)]
+            points.append((ox + x + rng.gauss(0, noise), oy + y + rng.gauss(0, noise)))
+    return points
+
+
+@pytest.mark.parametrize("degrees", [0, 26.565, 45, 89, 90, 135, 179])
+def test_wall_is_one_line(degrees):
+    rng = random.Random(0)
+    ux, uy = math.cos(math.radians(degrees)), math.sin(math.radians(degrees))
+    wall_map = WallMap()
+    for i in range(50):
+        t, e = i * 4.0, rng.gauss(0, 2)
+        wall_map.add_point(1000 + t * ux - e * uy, -500 + t * uy + e * ux)
+
+    assert len(wall_map) == 1
+    line = wall_map.lines[0]
+    assert line.n == 50
+    assert math.degrees(angle_between(line.angle, math.radians(degrees))) < 2
+    (x0, y0), (x1, y1) = line.end_points
+    assert math.hypot(x1 - x0, y1 - y0) == pytest.approx(196, abs=10)
+
+
+def test_vertical_wall_distance():
+    line = WallLine(0, 0)
+    for y in range(0, 100, 10):
+        line.add_point(5.0, float(y))
+
+    assert math.degrees(angle_between(line.angle, math.pi / 2)) < 1e-6
+    assert line.offset(5, 1e6) == pytest.approx(0, abs=1e-6)
+    assert line.in_line_radius(40, 50)
+    assert not line.in_line_radius(60, 50)
+    # past the end the distance is to the end point
+    assert line.distance(5, 130) == pytest.approx(40)
+
+
+def test_merged_moments_match_one_pass():
+    rng = random.Random(2)
+    points = [(1e6 + rng.uniform(0, 100), 1e6 + rng.uniform(0, 10)) for _ in range(40)]
+    one, left, right = LineMoments(), LineMoments(), LineMoments()
+    for i, (x, y) in enumerate(points):
+        one = one.plus_point(x, y)
+        if i < 15: left = left.plus_point(x, y)
+        else:      right = right.plus_point(x, y)
+    both = left.plus(right)
+
+    assert both.n == one.n
+    for name in ("mx", "my", "sxx", "syy", "sxy"):
+        assert getattr(both, name) == pytest.approx(getattr(one, name), rel=1e-9)
+
+
+def test_corner_point_joins_both_walls():
+    wall_map = WallMap()
+    for i in range(1, 30):
+        wall_map.add_point(i * 8.0, 0.0)
+    # starts out of reach of the first wall, the corner is found from the fits
+    for i in range(7, 30):
+        wall_map.add_point(0.0, i * 8.0)
+
+    assert len(wall_map) == 2
+    for line in wall_map.lines:
+        assert line.distance(0, 0) < 1
+
+
+def test_changes_are_reported_once():
+    wall_map = WallMap()
+    for i in range(10):
+        wall_map.add_point(i * 4.0, i * 2.0)
+    first = wall_map.lines[0]
+    assert wall_map.take_changes() == ({first}, set())
+    assert wall_map.take_changes() == (set(), set())
+
+    # too far along to join yet, so it starts a second line
+    wall_map.add_point(150.0, 75.0)
+    second = wall_map.lines[1]
+    assert wall_map.take_changes() == ({second}, set())
+
+    # filling the gap merges the second line into the first
+    for x in range(40, 150, 10):
+        wall_map.add_point(float(x), x / 2)
+    assert wall_map.lines == [first]
+    assert wall_map.take_changes() == ({first}, {second})
+
+
+@pytest.mark.parametrize("seed", [3, 4])
+def test_matches_ordered_pass_over_every_pair(seed):
+    # every pair in order, skipping those where neither line has changed
+    def brute(lines, dirty):
+        resolved, i = [], 0
+        while len(resolved) < len(lines):
+            j = i + 1
+            while j < len(lines):
+                a, b = lines[i], lines[j]
+                if a not in dirty and b not in dirty:
+                    j += 1
+                    continue
+                n_a, n_b = a.n, b.n
+                if a.connect_lines(b):
+                    lines.pop(j)
+                    dirty.add(a)
+                else:
+                    if a.n != n_a or b.n != n_b: dirty.update((a, b))
+                    j += 1
+            resolved.append(lines[i])
+            i += 1
+        return resolved
+
+    def run(points, indexed):
+        wall_map, lines = WallMap(), []
+        for x, y in points:
+            if indexed:
+                wall_map.add_point(x, y)
+                continue
+            dirty = set()
+            for line in lines:
+                if line.in_line_radius(x, y):
+                    dirty.add(line)
+                    line.add_point(x, y)
+            if not dirty:
+                line = WallLine(x, y)
+                line.add_point(x, y)
+                lines.append(line)
+                dirty.add(line)
+            lines = brute(lines, dirty)
+        return [(line.n, line.end_points) for line in (wall_map.lines if indexed else lines)]
+
+    # visited in a random order so lines grow, merge and join corners
+    rng = random.Random(seed)
+    points = room_points(rng, rooms=6, per_room=40)
+    rng.shuffle(points)
+
+    assert run(points, indexed=True) == run(points, indexed=False)
@@ -0,0 +1,84 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "FireFighterTracker", "src"))
+
+pytest.importorskip("scipy")
+
+from models import zupt
+
+
+def looped_detect(signal, window_size, threshold):
+    """The per-sample loop the pages and scripts used to run"""
+    flags = np.zeros(len(signal), dtype=bool)
+    for i in range(window_size, len(signal)):
+        window = signal[i - window_size:i]
+        sigma = np.var(window)
+        dist = (signal[i] - np.mean(window)) / np.sqrt(sigma) if sigma > 0 else 0
+        flags[i] = abs(dist) < threshold
+    return flags
+
+
+@pytest.fixture
+def walk():
+    # standing, walking with a step every 0.5s, standing, at 200Hz around 9.8
+    rng = np.random.default_rng(0)
+    t = np.arange(0, 12, 0.005)
+    walking = (t > 3) & (t < 9)
+    return 9.8 + walking * 3 * np.sin(2 * np.pi * 2 * t) + rng.normal(0, 0.05, len(t))
+
+
+@pytest.mark.parametrize("window_size", [1, 10, 80])
+def test_rolling_stats_match_slices(walk, window_size):
+    mean, var = zupt.rolling_stats(walk, window_size)
+    assert np.isnan(mean[:window_size]).all()
+    for i in range(window_size, len(walk), 97):
+        assert mean[i] == pytest.approx(walk[i - window_size:i].mean())
+        assert var[i] == pytest.approx(walk[i - window_size:i].var(), rel=1e-6, abs=1e-12)
+
+
+@pytest.mark.parametrize("window_size", [10, 80])
+def test_detect_matches_the_loop(walk, window_size):
+    expected = looped_detect(walk, window_size, 0.6)
+    assert np.array_equal(zupt.detect(walk, window_size, 0.6), expected)
+    assert 0 < expected.sum() < len(walk)
+
+
+def test_constant_window_is_still():
+    signal = np.concatenate([np.linspace(0, 5, 50), np.full(30, 7.3)])
+    assert zupt.detect(signal, 10)[70:].all()
+
+
+def test_detector_matches_batch_in_any_chunks(walk):
+    expected = zupt.detect(walk, 80)
+    for chunk in [1, 3, 50, 1000]:
+        detector = zupt.ZuptDetector(80)
+        flags = np.concatenate([detector.update(walk[i:i + chunk]) for i in range(0, len(walk), chunk)])
+        assert np.array_equal(flags, expected)
+        assert len(detector.tail) == 80
+
+
+def test_integrator_matches_batch_two_samples_behind(walk):
+    expected = zupt.positions(walk, 0.005)
+    for chunk in [1, 4, 333]:
+        integrator = zupt.ZuptIntegrator(0.005)
+        out = np.concatenate([integrator.update(walk[i:i + chunk]) for i in range(0, len(walk), chunk)])
+        assert len(out) == len(walk) - 2
+        assert out == pytest.approx(expected[:-2], abs=1e-9)
+
+
+def test_integrator_needs_odd_smoothing():
+    with pytest.raises(ValueError):
+        zupt.ZuptIntegrator(0.01, smoothing=4)
+
+
+@pytest.mark.parametrize("length", [1, 2, 3, 7, 500])
+def test_finish_gives_the_last_samples(walk, length):
+    signal = walk[:length]
+    integrator = zupt.ZuptIntegrator(0.005)
+    out = np.concatenate([integrator.update(signal[i:i + 3]) for i in range(0, length, 3)] + [integrator.finish()])
+    expected = zupt.positions(signal, 0.005)
+    assert out == pytest.approx(expected, abs=1e-9)